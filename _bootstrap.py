@@ -0,0 +1,12 @@
+"""
+Django setup shared by the check_*.py scripts.
+
+Import this before any models so the scripts can be run directly with
+`python check_*.py` from the project root.
+"""
+
+import os
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'schools_air_quality_msp4.settings')
+django.setup()
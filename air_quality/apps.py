@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AirQualityConfig(AppConfig):
     name = 'air_quality'
+    
+    def ready(self):
+        # Connect the receivers keeping Sensor.last_* in step with readings
+        from . import signals  # noqa: F401
@@ -0,0 +1,36 @@
+"""
+JSON encoding and decoding, with orjson when it's installed.
+
+Used by the API clients, management commands, map view and the standalone
+LAEI/GIAS scripts. Plain Python only, so the scripts can import it without
+setting up Django.
+"""
+
+import json
+
+# Optional: faster decoding of large API responses and encoding of the map data
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def loads(data):
+    """Decode JSON from bytes or str; raises ValueError on invalid input."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data, indent=False) -> str:
+    """
+    Encode data as a JSON string, compact or indented by two spaces.
+
+    Non-ASCII characters are written as-is on both paths, as orjson does.
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
@@ -18,29 +18,79 @@ Usage:
 """
 
 from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from django.utils import timezone
 from air_quality.models import Sensor
 from schools.models import School
-from math import radians, sin, cos, sqrt, atan2
+from maps.cache import clear_map_cache
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+EARTH_RADIUS_M = 6371000  # Earth's radius in meters
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
     """
     Calculate the great-circle distance between two points in meters.
-    """
-    R = 6371000  # Earth's radius in meters
     
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    Accepts scalars or NumPy arrays; arrays broadcast, so one school can be
+    compared against every sensor in a single call.
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+    return haversine_from_radians(lat1, lon1, np.cos(lat1), lat2, lon2, np.cos(lat2))
+
+
+def haversine_from_radians(lat1, lon1, cos_lat1, lat2, lon2, cos_lat2):
+    """
+    Haversine distance in meters from coordinates already in radians.
     
+    Takes the latitude cosines as arguments so callers comparing one point
+    against many can compute them once rather than per pair.
+    """
     dlat = lat2 - lat1
     dlon = lon2 - lon1
     
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
+    a = np.sin(dlat*0.5)**2 + cos_lat1 * cos_lat2 * np.sin(dlon*0.5)**2
+    # Equivalent to 2·atan2(√a, √(1−a)) with one sqrt fewer; clamp guards
+    # against rounding pushing a fractionally above 1
+    c = 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
     
-    return R * c
+    return EARTH_RADIUS_M * c
+
+
+def nearest_within(distances, candidate_idx, threshold):
+    """
+    Find the nearest candidate sensor for every school in one pass.
+    
+    Args:
+        distances: (schools × sensors) distance matrix in meters
+        candidate_idx: Column indices of the sensors eligible for selection
+        threshold: Maximum distance in meters
+    
+    Returns:
+        (sensor_index, distance) arrays with one entry per school; the index
+        is -1 where no candidate lies within the threshold
+    """
+    n_schools = distances.shape[0]
+    if not candidate_idx.size:
+        return np.full(n_schools, -1), np.full(n_schools, np.inf)
+    
+    candidates = distances[:, candidate_idx]
+    best = np.argmin(candidates, axis=1)
+    best_distance = candidates[np.arange(n_schools), best]
+    
+    return np.where(best_distance <= threshold, candidate_idx[best], -1), best_distance
+
+
+# School columns written by the assignment
+UPDATE_FIELDS = [
+    'direct_sensor', 'direct_sensor_distance',
+    'reference_sensor', 'reference_sensor_distance',
+    'data_source', 'updated_at',
+]
 
 
 class Command(BaseCommand):
@@ -70,14 +120,22 @@ class Command(BaseCommand):
         reference_threshold = options['reference_threshold']
         dry_run = options['dry_run']
         
-        schools = School.objects.all()
+        # Only the columns read below; the assigned columns are set on
+        # these instances and written back with bulk_update
+        schools = list(
+            School.objects.only('id', 'name', 'latitude', 'longitude').order_by('name')
+        )
+        total = len(schools)
         all_sensors = Sensor.objects.filter(is_active=True)
-        laqn_sensors = all_sensors.filter(network='LAQN')
+        sensor_counts = all_sensors.aggregate(
+            total=Count('id'),
+            laqn=Count('id', filter=Q(network='LAQN')),
+        )
         
         self.stdout.write(f'\nHybrid Sensor Assignment')
         self.stdout.write('=' * 50)
-        self.stdout.write(f'Schools to process: {schools.count()}')
-        self.stdout.write(f'Available sensors: {all_sensors.count()} total, {laqn_sensors.count()} LAQN')
+        self.stdout.write(f'Schools to process: {total}')
+        self.stdout.write(f'Available sensors: {sensor_counts["total"]} total, {sensor_counts["laqn"]} LAQN')
         self.stdout.write(f'Direct threshold: {direct_threshold}m (urban background only)')
         self.stdout.write(f'Reference threshold: {reference_threshold}m (LAQN only)')
         if dry_run:
@@ -91,57 +149,84 @@ class Command(BaseCommand):
             'direct_breathe': 0,
         }
         
+        # Sensor coordinates and classification as arrays, built once.
+        # Plain dicts are enough here - schools are linked by sensor id.
+        # Only sensors that can win either selection are fetched.
+        candidate_sensors = all_sensors.filter(
+            Q(site_type='urban_background') | Q(network='LAQN')
+        )
+        sensor_list = list(candidate_sensors.values(
+            'id', 'site_code', 'network', 'site_type', 'latitude', 'longitude'
+        ))
+        sensor_lat = np.array([s['latitude'] for s in sensor_list], dtype=float)
+        sensor_lon = np.array([s['longitude'] for s in sensor_list], dtype=float)
+        # Candidate indices for each selection, so each is a single bounded scan
+        laqn_idx = np.flatnonzero([s['network'] == 'LAQN' for s in sensor_list])
+        urban_bg_idx = np.flatnonzero([s['site_type'] == 'urban_background' for s in sensor_list])
+        sensor_lat_r = np.radians(sensor_lat)
+        sensor_lon_r = np.radians(sensor_lon)
+        sensor_cos_lat = np.cos(sensor_lat_r)
+        
+        located = []
         for school in schools:
             if not school.latitude or not school.longitude:
                 logger.warning(f'School {school.name} has no coordinates')
                 continue
-            
-            # Calculate distances to all sensors
-            sensor_distances = []
-            for sensor in all_sensors:
-                distance = haversine_distance(
-                    school.latitude, school.longitude,
-                    sensor.latitude, sensor.longitude
-                )
-                sensor_distances.append({
-                    'sensor': sensor,
-                    'distance': distance,
-                })
-            
-            # Sort by distance
-            sensor_distances.sort(key=lambda x: x['distance'])
-            
+            located.append(school)
+        
+        school_lat_r = np.radians([float(s.latitude) for s in located])[:, np.newaxis]
+        school_lon_r = np.radians([float(s.longitude) for s in located])[:, np.newaxis]
+        school_cos_lat = np.cos(school_lat_r)
+        
+        # Cheap bounding-box test first: pairs outside the box can't be within
+        # either threshold, so the trig is only evaluated for pairs inside it.
+        # Padded 10% so the flat box never cuts off a pair the haversine accepts.
+        box_lat_r = 1.1 * max(direct_threshold, reference_threshold) / EARTH_RADIUS_M
+        box_lon_r = box_lat_r / np.maximum(school_cos_lat, 0.1)
+        in_box = (
+            (np.abs(school_lat_r - sensor_lat_r) <= box_lat_r)
+            & (np.abs(school_lon_r - sensor_lon_r) <= box_lon_r)
+        )
+        
+        # (schools × sensors) distance matrix, infinite outside the box,
+        # then the nearest direct and reference sensor for every school at once
+        rows, cols = np.nonzero(in_box)
+        distances = np.full(in_box.shape, np.inf)
+        distances[rows, cols] = haversine_from_radians(
+            school_lat_r[rows, 0], school_lon_r[rows, 0], school_cos_lat[rows, 0],
+            sensor_lat_r[cols], sensor_lon_r[cols], sensor_cos_lat[cols]
+        )
+        direct_idx, direct_dist = nearest_within(distances, urban_bg_idx, direct_threshold)
+        reference_idx, reference_dist = nearest_within(distances, laqn_idx, reference_threshold)
+        
+        # Changed schools are written in batches after the loop
+        now = timezone.now()
+        updates = []
+        direct_messages = []
+        
+        for i, school in enumerate(located):
             # === DIRECT SENSOR ASSIGNMENT ===
             # Only urban background sensors within 150m qualify
             direct_sensor = None
             direct_distance = None
             
-            for sd in sensor_distances:
-                sensor = sd['sensor']
-                distance = sd['distance']
+            if direct_idx[i] >= 0:
+                direct_sensor = sensor_list[direct_idx[i]]
+                direct_distance = round(float(direct_dist[i]), 1)
                 
-                if distance > direct_threshold:
-                    break  # No point checking further
-                
-                if sensor.site_type == 'urban_background':
-                    direct_sensor = sensor
-                    direct_distance = round(distance, 1)
-                    
-                    if sensor.network == 'LAQN':
-                        stats['direct_laqn'] += 1
-                    else:
-                        stats['direct_breathe'] += 1
-                    break
+                if direct_sensor['network'] == 'LAQN':
+                    stats['direct_laqn'] += 1
+                else:
+                    stats['direct_breathe'] += 1
             
             # === REFERENCE SENSOR ASSIGNMENT ===
             # Nearest LAQN sensor for adjustment factors (any site type)
             reference_sensor = None
             reference_distance = None
             
-            laqn_distances = [sd for sd in sensor_distances if sd['sensor'].network == 'LAQN']
-            if laqn_distances and laqn_distances[0]['distance'] <= reference_threshold:
-                reference_sensor = laqn_distances[0]['sensor']
-                reference_distance = round(laqn_distances[0]['distance'], 1)
+            if reference_idx[i] >= 0:
+                reference_sensor = sensor_list[reference_idx[i]]
+                reference_distance = round(float(reference_dist[i]), 1)
             
             # === DETERMINE DATA SOURCE ===
             if direct_sensor:
@@ -156,27 +241,35 @@ class Command(BaseCommand):
             
             # === UPDATE SCHOOL ===
             if not dry_run:
-                school.direct_sensor = direct_sensor
+                school.direct_sensor_id = direct_sensor['id'] if direct_sensor else None
                 school.direct_sensor_distance = direct_distance
-                school.reference_sensor = reference_sensor
+                school.reference_sensor_id = reference_sensor['id'] if reference_sensor else None
                 school.reference_sensor_distance = reference_distance
                 school.data_source = data_source
-                school.save()
+                # bulk_update skips save(), so auto_now has to be set by hand
+                school.updated_at = now
+                updates.append(school)
             
             # Verbose output for direct assignments (they're rare and interesting)
             if direct_sensor:
-                self.stdout.write(
+                direct_messages.append(
                     f'  ✓ DIRECT: {school.name[:40]:<40} ← '
-                    f'{direct_sensor.site_code} ({direct_distance}m, {direct_sensor.network})'
+                    f'{direct_sensor["site_code"]} ({direct_distance}m, {direct_sensor["network"]})'
                 )
         
+        if direct_messages:
+            self.stdout.write('\n'.join(direct_messages))
+        
+        if updates:
+            School.objects.bulk_update(updates, UPDATE_FIELDS, batch_size=500)
+            # bulk_update sends no post_save, so the map cache is cleared here
+            clear_map_cache()
+        
         # === SUMMARY ===
         self.stdout.write('\n' + '=' * 50)
         self.stdout.write(self.style.SUCCESS('Assignment Summary'))
         self.stdout.write('=' * 50)
         
-        total = schools.count()
-        
         self.stdout.write(f'\nData source breakdown:')
         self.stdout.write(
             f'  DIRECT (sensor ≤{direct_threshold}m, urban background): '
@@ -0,0 +1,192 @@
+"""
+Django management command to report on LAQN sensor data and school assignments.
+
+Runs all the checks in one Django process. check_laqn_data.py,
+check_laqn_mismatch.py and check_working_sensors.py are thin wrappers that
+call this command with a single --target.
+
+Usage:
+    python manage.py check_laqn
+    python manage.py check_laqn --target=working
+    python manage.py check_laqn --target=data --target=mismatch
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from air_quality.models import Sensor, Reading
+from schools.models import School
+
+
+# The 3 LAQN sensors with data
+WORKING_SENSORS = ['LB4', 'LB6', 'SK5']
+
+
+class Command(BaseCommand):
+    help = 'Report on LAQN sensor data and the schools using it'
+    
+    TARGETS = ('data', 'mismatch', 'working')
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            action='append',
+            choices=self.TARGETS,
+            help='Check to run (can be specified multiple times, default: all)'
+        )
+    
+    def handle(self, *args, **options):
+        targets = dict.fromkeys(options.get('target') or self.TARGETS)
+        
+        for target in targets:
+            # Each report is built up and written once, not line by line
+            lines = getattr(self, f'_check_{target}')()
+            self.stdout.write('\n'.join(lines))
+    
+    def _check_data(self) -> list:
+        """Sensor and reading counts per network."""
+        lines = []
+        
+        # Check LAQN sensors
+        laqn_count = Sensor.objects.filter(network='LAQN').count()
+        lines.append(f'Total LAQN sensors: {laqn_count}')
+        
+        # Check if any have readings
+        laqn_with_readings = Sensor.objects.filter(network='LAQN').annotate(
+            reading_count=Count('readings')
+        ).filter(reading_count__gt=0)
+        with_readings_count = laqn_with_readings.count()
+        lines.append(f'LAQN sensors with readings: {with_readings_count}')
+        
+        # Show sample
+        if with_readings_count:
+            lines.append('\nSample sensors with data:')
+            for sensor in laqn_with_readings[:5]:
+                # Served from the sensor's latest-reading columns, no extra query
+                latest = sensor.get_latest_reading()
+                lines.append(f'\n  {sensor.site_code} ({sensor.name}):')
+                lines.append(f'    Total readings: {sensor.reading_count}')
+                if latest:
+                    lines.append(f'    Latest timestamp: {latest.timestamp}')
+                    lines.append(f'    NO2: {latest.no2}, PM2.5: {latest.pm25}, PM10: {latest.pm10}')
+        else:
+            lines.append('\n❌ No LAQN sensors have readings yet.')
+        
+        # Total readings for both networks in one query
+        reading_totals = Reading.objects.aggregate(
+            laqn=Count('id', filter=Q(sensor__network='LAQN')),
+            breathe=Count('id', filter=Q(sensor__network='BREATHE')),
+        )
+        lines.append(f'\nTotal LAQN readings in database: {reading_totals["laqn"]}')
+        
+        # Check Breathe London too
+        breathe_count = Sensor.objects.filter(network='BREATHE').count()
+        lines.append(f'\nBreath London sensors: {breathe_count}')
+        lines.append(f'Breathe London readings: {reading_totals["breathe"]}')
+        
+        return lines
+    
+    def _check_mismatch(self) -> list:
+        """LAQN site codes in the database vs the ones schools reference."""
+        lines = ['LAQN sensors in database:']
+        
+        # Reading counts come back with the sensors in one GROUP BY query
+        laqn = Sensor.objects.filter(network='LAQN').annotate(
+            reading_count=Count('readings')
+        ).values('site_code', 'name', 'reading_count')
+        for s in laqn:
+            lines.append(f'  {s["site_code"]} - {s["name"]} ({s["reading_count"]} readings)')
+        
+        lines.append('\n\nReference sensors being requested by schools:')
+        schools_needing_laqn = School.objects.filter(
+            data_source='ADJUSTED',
+            reference_sensor__isnull=False
+        ).values('reference_sensor')
+        
+        # Schools per reference sensor, counted in one GROUP BY query
+        ref_counts = School.objects.filter(
+            reference_sensor__in=schools_needing_laqn
+        ).values('reference_sensor').annotate(
+            school_count=Count('id')
+        ).order_by('reference_sensor')
+        
+        for ref in ref_counts[:10]:
+            lines.append(f'  "{ref["reference_sensor"]}" - {ref["school_count"]} schools')
+        
+        return lines
+    
+    def _check_working(self) -> list:
+        """Schools assigned to the LAQN sensors that have real-time data."""
+        lines = ['Schools assigned to working LAQN sensors (with real-time data):\n']
+        lines.append('=' * 70)
+        
+        # All working sensors and their reading counts in one query
+        sensors_by_code = {
+            sensor.site_code: sensor
+            for sensor in Sensor.objects.filter(
+                site_code__in=WORKING_SENSORS
+            ).annotate(reading_count=Count('readings'))
+        }
+        
+        for site_code in WORKING_SENSORS:
+            sensor = sensors_by_code.get(site_code)
+            if sensor is None:
+                lines.append(f'\n{site_code}: NOT FOUND IN DATABASE')
+                lines.append('-' * 70)
+                continue
+            
+            # Served from the sensor's latest-reading columns, no extra query
+            latest = sensor.get_latest_reading()
+            
+            lines.append(f'\n{site_code} - {sensor.name}')
+            lines.append(f'  Readings: {sensor.reading_count}, Latest: {latest.timestamp if latest else "None"}')
+            
+            # Schools using this as reference sensor (ADJUSTED)
+            ref_schools = list(School.objects.filter(
+                data_source='ADJUSTED',
+                reference_sensor=sensor
+            ).only('name', 'reference_sensor_distance').order_by('name'))
+            
+            # Schools using this as direct sensor (DIRECT)
+            direct_schools = list(School.objects.filter(
+                data_source='DIRECT',
+                direct_sensor=sensor
+            ).only('name', 'direct_sensor_distance').order_by('name'))
+            
+            lines.append(f'\n  Schools with ADJUSTED data (using {site_code} for adjustment): {len(ref_schools)}')
+            for school in ref_schools:
+                dist = f"{school.reference_sensor_distance}m" if school.reference_sensor_distance else "?"
+                lines.append(f'    • {school.name} ({dist})')
+            
+            lines.append(f'\n  Schools with DIRECT data (sensor within 150m): {len(direct_schools)}')
+            for school in direct_schools:
+                dist = f"{school.direct_sensor_distance}m" if school.direct_sensor_distance else "?"
+                lines.append(f'    • {school.name} ({dist})')
+            
+            lines.append('-' * 70)
+        
+        # Summary
+        totals = School.objects.aggregate(
+            adjusted=Count('id', filter=Q(
+                data_source='ADJUSTED',
+                reference_sensor__site_code__in=WORKING_SENSORS
+            )),
+            direct=Count('id', filter=Q(
+                data_source='DIRECT',
+                direct_sensor__site_code__in=WORKING_SENSORS
+            )),
+            all_adjusted=Count('id', filter=Q(data_source='ADJUSTED')),
+        )
+        total_adjusted, total_direct = totals['adjusted'], totals['direct']
+        
+        lines.append(f'\n{"=" * 70}')
+        lines.append(f'SUMMARY: {total_adjusted + total_direct} schools have real-time LAQN data')
+        lines.append(f'  • {total_adjusted} schools with ADJUSTED readings')
+        lines.append(f'  • {total_direct} schools with DIRECT readings')
+        lines.append(f'{"=" * 70}\n')
+        
+        # Check schools without working sensors
+        without_data = totals['all_adjusted'] - total_adjusted
+        lines.append(f'Note: {without_data} schools are configured for ADJUSTED but their')
+        lines.append(f'      reference sensors don\'t have data yet (13 LAQN sensors missing data)')
+        
+        return lines
@@ -1,7 +1,8 @@
 """
 Fetch readings from all sensor networks (LAQN and Breathe London).
 
-This combines both fetch commands for easy scheduling via cron.
+This combines both fetch commands for easy scheduling via cron. The two
+networks are fetched concurrently.
 
 Usage:
     python manage.py fetch_all_readings
@@ -10,6 +11,9 @@ Usage:
 
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
+from django.db import connection
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
 
 
 class Command(BaseCommand):
@@ -34,21 +38,29 @@ class Command(BaseCommand):
             )
         )
         
+        # Both networks are independent APIs, so fetch them concurrently.
+        # Each command's output is buffered and printed in order afterwards.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            laqn = executor.submit(self._run_fetch, 'fetch_laqn_readings', hours)
+            breathe = executor.submit(self._run_fetch, 'fetch_breathe_readings', hours)
+        
         # Fetch LAQN readings
         self.stdout.write('\n[1/2] Fetching LAQN readings...')
-        try:
-            call_command('fetch_laqn_readings', hours=hours)
+        output, error = laqn.result()
+        self.stdout.write(output, ending='')
+        if error is None:
             self.stdout.write(self.style.SUCCESS('✓ LAQN fetch complete\n'))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'✗ LAQN fetch failed: {e}\n'))
+        else:
+            self.stdout.write(self.style.ERROR(f'✗ LAQN fetch failed: {error}\n'))
         
         # Fetch Breathe London readings
         self.stdout.write('[2/2] Fetching Breathe London readings...')
-        try:
-            call_command('fetch_breathe_readings', hours=hours)
+        output, error = breathe.result()
+        self.stdout.write(output, ending='')
+        if error is None:
             self.stdout.write(self.style.SUCCESS('✓ Breathe London fetch complete\n'))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'✗ Breathe London fetch failed: {e}\n'))
+        else:
+            self.stdout.write(self.style.ERROR(f'✗ Breathe London fetch failed: {error}\n'))
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -57,3 +69,19 @@ class Command(BaseCommand):
                 f'{"="*60}\n'
             )
         )
+    
+    def _run_fetch(self, command: str, hours: int):
+        """
+        Run one fetch command in a worker thread, capturing its output.
+        
+        Returns (output, error) where error is None on success.
+        """
+        output = StringIO()
+        try:
+            call_command(command, hours=hours, stdout=output, stderr=output)
+            return output.getvalue(), None
+        except Exception as e:
+            return output.getvalue(), e
+        finally:
+            # Each thread opens its own database connection
+            connection.close()
@@ -13,12 +13,18 @@ Usage:
 from django.core.management.base import BaseCommand
 from air_quality.models import Sensor, SensorAnnualStats
 from air_quality.services.laqn_api import LAQNApi
+from maps.cache import clear_map_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Pollutants stored in SensorAnnualStats, in field order
+SPECIES = ('NO2', 'PM25', 'PM10', 'O3')
+
+
 class Command(BaseCommand):
     help = 'Fetch annual statistics from LAQN sensors for adjustment factor calculations'
     
@@ -39,12 +45,18 @@ class Command(BaseCommand):
             action='store_true',
             help='Overwrite existing annual stats'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Sensors fetched concurrently (default: 8)'
+        )
     
     def handle(self, *args, **options):
         api = LAQNApi()
         
         # Determine years to fetch
-        years = options.get('year') or [datetime.now().year - 1]
+        years = list(dict.fromkeys(options.get('year') or [datetime.now().year - 1]))
         
         # Get LAQN sensors
         if options['sensor']:
@@ -59,11 +71,17 @@ class Command(BaseCommand):
                 is_active=True
             )
         
-        if not sensors.exists():
+        # Only the columns used below - skips the metadata JSON
+        sensors = sensors.only('id', 'site_code', 'name')
+        
+        # Evaluate once - used for the count and the fetch loop
+        sensors = list(sensors)
+        
+        if not sensors:
             self.stdout.write(self.style.WARNING('No active LAQN sensors found.'))
             return
         
-        self.stdout.write(f'Fetching annual statistics for {sensors.count()} LAQN sensors')
+        self.stdout.write(f'Fetching annual statistics for {len(sensors)} LAQN sensors')
         self.stdout.write(f'Years: {", ".join(map(str, years))}')
         self.stdout.write('')
         
@@ -72,49 +90,71 @@ class Command(BaseCommand):
         skipped_count = 0
         error_count = 0
         
-        for sensor in sensors:
-            self.stdout.write(f'  {sensor.site_code} ({sensor.name[:30]}):')
+        # Existing (sensor, year) pairs in one query
+        existing = set(
+            SensorAnnualStats.objects.filter(
+                sensor__in=sensors,
+                year__in=years
+            ).values_list('sensor_id', 'year')
+        )
+        
+        stats_to_save = []
+        
+        # Sensors are fetched concurrently; results are reported and saved
+        # here on the main thread as each sensor completes
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {}
+            for sensor in sensors:
+                if options['overwrite']:
+                    fetch_years = years
+                else:
+                    fetch_years = [y for y in years if (sensor.id, y) not in existing]
+                futures[executor.submit(self._fetch_sensor_means, api, sensor.site_code, fetch_years)] = sensor
             
-            for year in years:
-                # Check if already exists
-                existing = SensorAnnualStats.objects.filter(
-                    sensor=sensor,
-                    year=year
-                ).first()
+            for future in as_completed(futures):
+                sensor = futures[future]
+                results = future.result()
                 
-                if existing and not options['overwrite']:
-                    self.stdout.write(f'    {year}: Already exists (use --overwrite to update)')
-                    skipped_count += 1
-                    continue
+                # One write per sensor rather than per line
+                lines = [f'  {sensor.site_code} ({sensor.name[:30]}):']
                 
-                # Fetch each pollutant
-                try:
-                    no2_mean = api.get_annual_mean(sensor.site_code, year, 'NO2')
-                    pm25_mean = api.get_annual_mean(sensor.site_code, year, 'PM25')
-                    pm10_mean = api.get_annual_mean(sensor.site_code, year, 'PM10')
-                    o3_mean = api.get_annual_mean(sensor.site_code, year, 'O3')
+                for year in years:
+                    # Check if already exists
+                    if year not in results:
+                        lines.append(f'    {year}: Already exists (use --overwrite to update)')
+                        skipped_count += 1
+                        continue
+                    
+                    means = results[year]
+                    
+                    if isinstance(means, Exception):
+                        logger.error(f'Error fetching stats for {sensor.site_code} {year}: {means}')
+                        lines.append(
+                            self.style.ERROR(f'    {year}: Error - {str(means)[:50]}')
+                        )
+                        error_count += 1
+                        continue
+                    
+                    no2_mean, pm25_mean, pm10_mean, o3_mean = means
                     
                     # Check if we got any data
-                    if not any([no2_mean, pm25_mean, pm10_mean, o3_mean]):
-                        self.stdout.write(
+                    if not any(means):
+                        lines.append(
                             self.style.WARNING(f'    {year}: No data available')
                         )
                         skipped_count += 1
                         continue
                     
-                    # Create or update
-                    stats, created = SensorAnnualStats.objects.update_or_create(
+                    stats_to_save.append(SensorAnnualStats(
                         sensor=sensor,
                         year=year,
-                        defaults={
-                            'no2_mean': no2_mean,
-                            'pm25_mean': pm25_mean,
-                            'pm10_mean': pm10_mean,
-                            'o3_mean': o3_mean,
-                        }
-                    )
+                        no2_mean=no2_mean,
+                        pm25_mean=pm25_mean,
+                        pm10_mean=pm10_mean,
+                        o3_mean=o3_mean,
+                    ))
                     
-                    if created:
+                    if (sensor.id, year) not in existing:
                         created_count += 1
                         status = self.style.SUCCESS('Created')
                     else:
@@ -132,14 +172,20 @@ class Command(BaseCommand):
                     if o3_mean:
                         values.append(f'O₃={o3_mean:.1f}')
                     
-                    self.stdout.write(f'    {year}: {status} - {", ".join(values)} µg/m³')
-                    
-                except Exception as e:
-                    logger.error(f'Error fetching stats for {sensor.site_code} {year}: {e}')
-                    self.stdout.write(
-                        self.style.ERROR(f'    {year}: Error - {str(e)[:50]}')
-                    )
-                    error_count += 1
+                    lines.append(f'    {year}: {status} - {", ".join(values)} µg/m³')
+                
+                self.stdout.write('\n'.join(lines))
+        
+        # Create or update
+        if stats_to_save:
+            SensorAnnualStats.objects.bulk_create(
+                stats_to_save,
+                update_conflicts=True,
+                unique_fields=['sensor', 'year'],
+                update_fields=['no2_mean', 'pm25_mean', 'pm10_mean', 'o3_mean'],
+            )
+            # Adjustment factors on the map are scaled by these means
+            clear_map_cache()
         
         # Summary
         self.stdout.write('')
@@ -157,3 +203,22 @@ class Command(BaseCommand):
         
         self.stdout.write('')
         self.stdout.write(f'LAQN sensors with annual stats: {sensors_with_stats}/{total_sensors}')
+    
+    @staticmethod
+    def _fetch_sensor_means(api, site_code, years) -> dict:
+        """
+        Fetch the four annual means for each year for one sensor.
+        
+        All four pollutants come from a single request per year. Runs in a
+        worker thread, so it only talks to the API - no database access.
+        Returns {year: (no2, pm25, pm10, o3)}, or the exception raised for
+        that year.
+        """
+        results = {}
+        for year in years:
+            try:
+                means = api.get_annual_means(site_code, year, SPECIES)
+                results[year] = tuple(means[species] for species in SPECIES)
+            except Exception as e:
+                results[year] = e
+        return results
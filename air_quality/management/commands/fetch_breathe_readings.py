@@ -13,12 +13,19 @@ from django.conf import settings
 from django.utils import timezone
 from air_quality.models import Sensor, Reading
 from air_quality.services.breathe_london_api import BreatheLondonApi
-from datetime import timedelta
+from maps.cache import clear_map_cache
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Reading columns overwritten when an hour is fetched again
+READING_FIELDS = ['no2', 'pm25', 'pm10', 'o3', 'nox']
+
+
 class Command(BaseCommand):
     help = 'Fetch latest readings from Breathe London sensors'
     
@@ -34,6 +41,12 @@ class Command(BaseCommand):
             type=str,
             help='Fetch for specific sensor site_code only'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Concurrent API requests (default: 8)'
+        )
     
     def handle(self, *args, **options):
         api_key = getattr(settings, 'BREATHE_LONDON_API_KEY', None)
@@ -60,96 +73,53 @@ class Command(BaseCommand):
                 is_active=True
             )
         
-        if not sensors.exists():
+        # Only the columns used below - skips the metadata JSON
+        sensors = sensors.only('id', 'site_code')
+        
+        # Evaluate once - used for the count and the fetch loop
+        sensors = list(sensors)
+        
+        if not sensors:
             self.stdout.write('No active Breathe London sensors found. Run sync_breathe_sensors first.')
             return
         
-        self.stdout.write(f'Fetching readings for {sensors.count()} sensors...')
+        self.stdout.write(f'Fetching readings for {len(sensors)} sensors...')
         
         readings_created = 0
         sensors_updated = 0
         errors = 0
         
-        for sensor in sensors:
-            try:   
-                # Calculate time range
-                end_time = timezone.now()
-                start_time = end_time - timedelta(hours=hours)
-                
-                # Fetch sensor data from Breathe London API
-                sensor_data = api.get_sensor_data(
+        # Calculate time range
+        end_time = timezone.now()
+        start_time = end_time - timedelta(hours=hours)
+        
+        # HTTP requests run concurrently; results are written to the
+        # database here on the main thread as each one completes
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(
+                    api.get_sensor_data,
                     site_code=sensor.site_code,  # Use sensor.site_code (e.g., "BL0001")
                     start_time=start_time,
-                    end_time=end_time 
-                )
-                
-                
-                if not sensor_data:
-                    continue
-                
-                # Process readings - group by timestamp
-                readings_by_time = {}
-                
-                for data_point in sensor_data:
-                    timestamp_str = data_point.get('DateTime')
-                    if not timestamp_str:
-                        continue
-                    
-                    # Parse timestamp
-                    try:
-                        from datetime import datetime
-                        # Expected format: "2026-01-25T10:00:00Z" or similar
-                        timestamp_str = timestamp_str.replace('Z', '+00:00')
-                        timestamp = datetime.fromisoformat(timestamp_str)
-                        if timezone.is_naive(timestamp):
-                            timestamp = timezone.make_aware(timestamp)
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f'Could not parse timestamp {timestamp_str}: {e}')
-                        continue
-                    
-                    # Round to hour for grouping
-                    hour_key = timestamp.replace(minute=0, second=0, microsecond=0)
-                    
-                    if hour_key not in readings_by_time:
-                        readings_by_time[hour_key] = {}
-                    
-                    # Extract pollutant value using Species and ScaledValue fields
-                    species = data_point.get('Species')
-                    value = data_point.get('ScaledValue')
-                    
-                    if value is not None:
-                        if species == 'NO2':
-                            readings_by_time[hour_key]['no2'] = float(value)
-                        elif species == 'PM2.5':
-                            readings_by_time[hour_key]['pm25'] = float(value)
-                        elif species == 'PM10':
-                            readings_by_time[hour_key]['pm10'] = float(value)
-                
-                # Create readings
-                for timestamp, values in readings_by_time.items():
-                    if not values:  # Skip empty readings
-                        continue
-                        
-                    reading, created = Reading.objects.update_or_create(
-                        sensor=sensor,
-                        timestamp=timestamp,
-                        defaults={
-                            'no2': values.get('no2'),
-                            'pm25': values.get('pm25'),
-                            'pm10': values.get('pm10'),
-                            'o3': values.get('o3'),
-                            'nox': values.get('nox'),
-                        }
-                    )
-                    if created:
-                        readings_created += 1
-                
-                sensors_updated += 1
-                
-            except Exception as e:
-                logger.error(f'Error fetching data for {sensor.site_code}: {e}')
-                errors += 1
-                continue
+                    end_time=end_time
+                ): sensor
+                for sensor in sensors
+            }
+            
+            for future in as_completed(futures):
+                sensor = futures[future]
+                try:
+                    sensor_data = future.result()
+                    readings_created += self._save_sensor_data(sensor, sensor_data)
+                    if sensor_data:
+                        sensors_updated += 1
+                except Exception as e:
+                    logger.error(f'Error fetching data for {sensor.site_code}: {e}')
+                    errors += 1
+        
+        # The sensors' latest readings moved without a post_save
+        if sensors_updated:
+            clear_map_cache()
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -157,3 +127,85 @@ class Command(BaseCommand):
                 f'from {sensors_updated} sensors ({errors} errors)'
             )
         )
+    
+    def _save_sensor_data(self, sensor, sensor_data) -> int:
+        """Group one sensor's data points by hour and save them as readings."""
+        if not sensor_data:
+            return 0
+        
+        # Process readings - group by timestamp. Entries are only created
+        # when a value is stored, so no hour ends up empty.
+        readings_by_time = defaultdict(dict)
+        
+        # Each timestamp repeats once per species, so parse each string once
+        hour_keys = {}
+        
+        for data_point in sensor_data:
+            timestamp_str = data_point.get('DateTime')
+            if not timestamp_str:
+                continue
+            
+            hour_key = hour_keys.get(timestamp_str)
+            if hour_key is None:
+                # Parse timestamp
+                try:
+                    # Expected format: "2026-01-25T10:00:00Z" or similar
+                    timestamp = datetime.fromisoformat(timestamp_str)
+                    if timezone.is_naive(timestamp):
+                        timestamp = timezone.make_aware(timestamp)
+                except (ValueError, TypeError) as e:
+                    logger.warning(f'Could not parse timestamp {timestamp_str}: {e}')
+                    continue
+                
+                # Round to hour for grouping
+                hour_key = timestamp.replace(minute=0, second=0, microsecond=0)
+                hour_keys[timestamp_str] = hour_key
+            
+            # Extract pollutant value using Species and ScaledValue fields
+            species = data_point.get('Species')
+            value = data_point.get('ScaledValue')
+            
+            if value is not None:
+                if species == 'NO2':
+                    readings_by_time[hour_key]['no2'] = float(value)
+                elif species == 'PM2.5':
+                    readings_by_time[hour_key]['pm25'] = float(value)
+                elif species == 'PM10':
+                    readings_by_time[hour_key]['pm10'] = float(value)
+        
+        if not readings_by_time:
+            return 0
+        
+        # One query to tell new hours from ones already stored
+        existing = set(
+            Reading.objects.filter(
+                sensor=sensor,
+                timestamp__in=readings_by_time.keys()
+            ).values_list('timestamp', flat=True)
+        )
+        
+        readings = [
+            Reading(
+                sensor=sensor,
+                timestamp=timestamp,
+                no2=values.get('no2'),
+                pm25=values.get('pm25'),
+                pm10=values.get('pm10'),
+                o3=values.get('o3'),
+                nox=values.get('nox'),
+            )
+            for timestamp, values in readings_by_time.items()
+        ]
+        
+        # Create readings - a single INSERT ... ON CONFLICT DO UPDATE
+        Reading.objects.bulk_create(
+            readings,
+            update_conflicts=True,
+            unique_fields=['sensor', 'timestamp'],
+            update_fields=READING_FIELDS,
+            batch_size=1000,
+        )
+        Sensor.record_latest_readings(readings)
+        readings_created = len(readings_by_time.keys() - existing)
+        
+        return readings_created
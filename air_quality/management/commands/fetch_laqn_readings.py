@@ -10,7 +10,9 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from air_quality.models import Sensor, Reading
 from air_quality.services.laqn_api import LAQNApi
-from datetime import datetime, timedelta
+from maps.cache import clear_map_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import UTC, datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,9 @@ SPECIES_MAP = {
     'NOX': 'nox',
 }
 
+# Reading columns overwritten when an hour is fetched again
+READING_FIELDS = ['no2', 'pm25', 'pm10', 'o3', 'nox']
+
 
 class Command(BaseCommand):
     help = 'Fetch latest readings from LAQN sensors'
@@ -40,6 +45,12 @@ class Command(BaseCommand):
             type=str,
             help='Fetch for specific sensor site_code only'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Concurrent API requests (default: 8)'
+        )
     
     def handle(self, *args, **options):
         api = LAQNApi()
@@ -58,83 +69,63 @@ class Command(BaseCommand):
                 is_active=True
             )
         
-        if not sensors.exists():
+        # Only the columns used below - skips the metadata JSON
+        sensors = sensors.only('id', 'site_code')
+        
+        # Evaluate once - used for the count and the fetch loop
+        sensors = list(sensors)
+        
+        if not sensors:
             self.stdout.write('No active LAQN sensors found.')
             return
         
-        self.stdout.write(f'Fetching readings for {sensors.count()} LAQN sensors...')
+        self.stdout.write(f'Fetching readings for {len(sensors)} LAQN sensors...')
         
-        start_date = datetime.now() - timedelta(hours=hours)
-        end_date = datetime.now()
+        end_date = timezone.now()
+        start_date = end_date - timedelta(hours=hours)
         
         readings_created = 0
         sensors_updated = 0
         sensors_no_data = 0  # New counter for sensors with no data
         errors = 0
         
-        for sensor in sensors:
-            try:
-                raw_readings = api.get_hourly_readings(
+        # Readings from every sensor, saved together after the loop
+        readings_to_save = []
+        
+        # HTTP requests run concurrently; responses are parsed here on the
+        # main thread as each one completes
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(
+                    api.get_hourly_readings,
                     site_code=sensor.site_code,
                     start_date=start_date,
                     end_date=end_date
-                )
-                
-                # Check if sensor has no data
-                if not raw_readings:
-                    sensors_no_data += 1
-                    continue
-                
-                # Group by timestamp
-                by_time = {}
-                for r in raw_readings:
-                    ts_str = r.get('timestamp')
-                    species = r.get('species')
-                    value = r.get('value')
-                    
-                    if not all([ts_str, species]):
-                        continue
+                ): sensor
+                for sensor in sensors
+            }
+            
+            for future in as_completed(futures):
+                sensor = futures[future]
+                try:
+                    raw_readings = future.result()
                     
-                    # Parse timestamp
-                    try:
-                        ts = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-                        ts = timezone.make_aware(ts)
-                    except ValueError:
+                    # Check if sensor has no data
+                    if not raw_readings:
+                        sensors_no_data += 1
                         continue
                     
-                    if ts not in by_time:
-                        by_time[ts] = {}
+                    readings_to_save.extend(self._parse_readings(sensor, raw_readings))
+                    sensors_updated += 1
                     
-                    if species in SPECIES_MAP and value:
-                        try:
-                            by_time[ts][SPECIES_MAP[species]] = float(value)
-                        except ValueError:
-                            pass
-                
-                # Create readings
-                for timestamp, values in by_time.items():
-                    if not values:
-                        continue
-                    
-                    reading, created = Reading.objects.update_or_create(
-                        sensor=sensor,
-                        timestamp=timestamp,
-                        defaults={
-                            'no2': values.get('no2'),
-                            'pm25': values.get('pm25'),
-                            'pm10': values.get('pm10'),
-                            'o3': values.get('o3'),
-                            'nox': values.get('nox'),
-                        }
-                    )
-                    if created:
-                        readings_created += 1
-                
-                sensors_updated += 1
-                
-            except Exception as e:
-                logger.error(f'Error fetching {sensor.site_code}: {e}')
-                errors += 1
+                except Exception as e:
+                    logger.error(f'Error fetching {sensor.site_code}: {e}')
+                    errors += 1
+        
+        if readings_to_save:
+            readings_created = self._save_readings(readings_to_save)
+            # The sensors' latest readings moved without a post_save
+            clear_map_cache()
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -143,3 +134,74 @@ class Command(BaseCommand):
                 f'({sensors_no_data} no data, {errors} errors)'
             )
         )
+    
+    def _parse_readings(self, sensor, raw_readings) -> list:
+        """Group one sensor's raw readings by timestamp into Reading objects."""
+        # Group by timestamp. Entries are only created when a value is
+        # stored, so no hour ends up empty.
+        by_time = {}
+        
+        # Each timestamp repeats once per species, so parse each string once
+        timestamps = {}
+        
+        for r in raw_readings:
+            field = SPECIES_MAP.get(r.get('species'))
+            value = r.get('value')
+            ts_str = r.get('timestamp')
+            
+            # Unmapped species and empty values never make it into a reading,
+            # so skip them before doing any parsing
+            if field is None or not value or not ts_str:
+                continue
+            
+            ts = timestamps.get(ts_str)
+            if ts is None:
+                # Parse timestamp - "2026-01-25 10:00:00", always GMT
+                try:
+                    ts = datetime.fromisoformat(ts_str).replace(tzinfo=UTC)
+                except ValueError:
+                    continue
+                timestamps[ts_str] = ts
+            
+            try:
+                by_time.setdefault(ts, {})[field] = float(value)
+            except ValueError:
+                pass
+        
+        return [
+            Reading(
+                sensor=sensor,
+                timestamp=timestamp,
+                no2=values.get('no2'),
+                pm25=values.get('pm25'),
+                pm10=values.get('pm10'),
+                o3=values.get('o3'),
+                nox=values.get('nox'),
+            )
+            for timestamp, values in by_time.items()
+        ]
+    
+    def _save_readings(self, readings) -> int:
+        """Upsert readings in batches and return how many were new."""
+        # One query to tell new hours from ones already stored
+        existing = set(
+            Reading.objects.filter(
+                sensor__in={reading.sensor_id for reading in readings},
+                timestamp__gte=min(reading.timestamp for reading in readings)
+            ).values_list('sensor_id', 'timestamp')
+        )
+        
+        # Create readings - one INSERT ... ON CONFLICT DO UPDATE per batch
+        Reading.objects.bulk_create(
+            readings,
+            update_conflicts=True,
+            unique_fields=['sensor', 'timestamp'],
+            update_fields=READING_FIELDS,
+            batch_size=1000,
+        )
+        Sensor.record_latest_readings(readings)
+        
+        return sum(
+            (reading.sensor_id, reading.timestamp) not in existing
+            for reading in readings
+        )
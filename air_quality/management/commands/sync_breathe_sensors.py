@@ -8,13 +8,22 @@ Usage:
 
 from django.core.management.base import BaseCommand
 from django.conf import settings
+from django.db.models import Count, Q
 from air_quality.models import Sensor
+from maps.cache import clear_map_cache
 from air_quality.services.breathe_london_api import BreatheLondonApi
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Sensor columns refreshed on every sync
+SENSOR_FIELDS = [
+    'name', 'latitude', 'longitude', 'network', 'site_type',
+    'borough', 'is_active', 'metadata', 'updated_at',
+]
+
+
 class Command(BaseCommand):
     help = 'Sync Breathe London sensor locations from OpenAQ API'
     
@@ -52,8 +61,8 @@ class Command(BaseCommand):
         
         self.stdout.write(f'Found {len(sensors)} Breathe London sensors')
         
-        created_count = 0
-        updated_count = 0
+        # Sensors keyed by code, so a sensor listed twice is only saved once
+        to_upsert = {}
         
         for sensor_data in sensors:
             # Extract sensor data from Breathe London API response
@@ -76,35 +85,54 @@ class Command(BaseCommand):
             else:
                 site_type = 'urban_background'  # Default
             
-            # Create or update sensor
-            sensor, created = Sensor.objects.update_or_create(
+            to_upsert[site_code] = Sensor(
                 site_code=site_code,
-                defaults={
-                    'name': name[:200],
-                    'latitude': float(latitude),
-                    'longitude': float(longitude),
-                    'network': 'BREATHE',
-                    'site_type': site_type,
-                    'borough': borough,
-                    'is_active': sensor_data.get('EndDate') is None,
-                    'metadata': {
-                        'device_code': sensor_data.get('DeviceCode'),
-                        'installation_code': sensor_data.get('InstallationCode'),
-                        'facility': sensor_data.get('Facility'),
-                        'sponsor': sensor_data.get('SponsorName'),
-                        'site_type': sensor_data.get('SiteLocationType'),
-                        'start_date': sensor_data.get('StartDate'),
-                        'end_date': sensor_data.get('EndDate'),
-                        'photo_url': sensor_data.get('SitePhotoURL'),
-                    }
+                name=name[:200],
+                latitude=float(latitude),
+                longitude=float(longitude),
+                network='BREATHE',
+                site_type=site_type,
+                borough=borough,
+                is_active=sensor_data.get('EndDate') is None,
+                metadata={
+                    'device_code': sensor_data.get('DeviceCode'),
+                    'installation_code': sensor_data.get('InstallationCode'),
+                    'facility': sensor_data.get('Facility'),
+                    'sponsor': sensor_data.get('SponsorName'),
+                    'site_type': sensor_data.get('SiteLocationType'),
+                    'start_date': sensor_data.get('StartDate'),
+                    'end_date': sensor_data.get('EndDate'),
+                    'photo_url': sensor_data.get('SitePhotoURL'),
                 }
             )
-            
-            if created:
+        
+        # One query to tell new sensors from ones already stored
+        existing = set(
+            Sensor.objects.filter(
+                site_code__in=to_upsert.keys()
+            ).values_list('site_code', flat=True)
+        )
+        
+        created_count = 0
+        updated_count = 0
+        
+        for site_code, sensor in to_upsert.items():
+            if site_code in existing:
+                updated_count += 1
+            else:
                 created_count += 1
                 self.stdout.write(f'  + Created: {sensor.name}')
-            else:
-                updated_count += 1
+        
+        # Create or update sensors - a single INSERT ... ON CONFLICT DO UPDATE
+        if to_upsert:
+            Sensor.objects.bulk_create(
+                to_upsert.values(),
+                update_conflicts=True,
+                unique_fields=['site_code'],
+                update_fields=SENSOR_FIELDS,
+                batch_size=500,
+            )
+            clear_map_cache()
         
         # Mark sensors not in current fetch as potentially inactive
         # (but don't auto-deactivate in case of API issues)
@@ -116,8 +144,11 @@ class Command(BaseCommand):
         )
         
         # Summary of sensor coverage
-        total_breathe = Sensor.objects.filter(network='BREATHE', is_active=True).count()
-        total_laqn = Sensor.objects.filter(network='LAQN', is_active=True).count()
+        totals = Sensor.objects.filter(is_active=True).aggregate(
+            breathe=Count('id', filter=Q(network='BREATHE')),
+            laqn=Count('id', filter=Q(network='LAQN')),
+        )
+        total_breathe, total_laqn = totals['breathe'], totals['laqn']
         self.stdout.write(f'\nTotal active sensors:')
         self.stdout.write(f'  LAQN (reference): {total_laqn}')
         self.stdout.write(f'  Breathe London:   {total_breathe}')
@@ -4,16 +4,29 @@ Django management command to sync LAQN sensors.
 Usage:
     python manage.py sync_laqn_sensors
     python manage.py sync_laqn_sensors --borough=Lambeth --borough=Southwark
+    python manage.py sync_laqn_sensors --all
+
+Without --borough the sync covers Lambeth and Southwark; --all syncs every
+borough present in the API response and overrides --borough.
 """
 
 from django.core.management.base import BaseCommand
 from air_quality.models import Sensor
+from maps.cache import clear_map_cache
 from air_quality.services.laqn_api import LAQNApi
+from collections import defaultdict
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Sensor columns refreshed on every sync
+SENSOR_FIELDS = [
+    'name', 'latitude', 'longitude', 'network', 'site_type',
+    'borough', 'is_active', 'metadata', 'updated_at',
+]
+
+
 class Command(BaseCommand):
     help = 'Sync LAQN monitoring sites from the London Air API'
     
@@ -27,30 +40,42 @@ class Command(BaseCommand):
         parser.add_argument(
             '--all',
             action='store_true',
-            help='Sync all London boroughs'
+            help='Sync every London borough in the API response (overrides --borough)'
         )
     
     def handle(self, *args, **options):
         api = LAQNApi()
         
+        # Every London site comes back from a single request, so fetch once
+        # and split by borough here rather than re-requesting per borough
+        try:
+            all_sites = api.get_monitoring_sites()
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f'Error fetching LAQN sites: {e}'))
+            return
+        
+        sites_by_borough = defaultdict(list)
+        for site in all_sites:
+            sites_by_borough[site.get('@LocalAuthorityName', '').lower()].append(site)
+        
         boroughs = options.get('borough') or []
         
-        if options['all'] or not boroughs:
+        if options['all']:
+            boroughs = sorted({
+                site['@LocalAuthorityName'] for site in all_sites
+                if site.get('@LocalAuthorityName')
+            })
+        elif not boroughs:
             # Default to Lambeth and Southwark for AirAware
-            if not boroughs:
-                boroughs = ['Lambeth', 'Southwark']
+            boroughs = ['Lambeth', 'Southwark']
         
         self.stdout.write(f'Syncing LAQN sensors for: {", ".join(boroughs)}')
         
-        created_count = 0
-        updated_count = 0
+        # Sites keyed by code, so a site listed twice is only saved once
+        to_upsert = {}
         
-        for borough in boroughs:  # ['Lambeth', 'Southark']
-            try:
-                sites = api.get_monitoring_sites(borough=borough)
-            except Exception as e:
-                self.stderr.write(self.style.ERROR(f'Error fetching {borough}: {e}'))
-                continue
+        for borough in dict.fromkeys(boroughs):
+            sites = sites_by_borough.get(borough.lower(), [])
             
             self.stdout.write(f'  {borough}: {len(sites)} sites found')
             
@@ -82,29 +107,41 @@ class Command(BaseCommand):
                 else:
                     site_type = 'urban_background'
                 
-                # Create or update
-                sensor, created = Sensor.objects.update_or_create(
+                to_upsert[site_code] = Sensor(
                     site_code=site_code,
-                    defaults={
-                        'name': site.get('@SiteName', site_code),
-                        'latitude': latitude,
-                        'longitude': longitude,
-                        'network': 'LAQN',
-                        'site_type': site_type,
-                        'borough': site.get('@LocalAuthorityName', borough),
-                        'is_active': site.get('@IsClosed', 'false').lower() != 'true',
-                        'metadata': {
-                            'local_authority_id': site.get('@LocalAuthorityId'),
-                            'site_link': site.get('@SiteLink'),
-                            'data_owner': site.get('@DataOwner'),
-                        }
+                    name=site.get('@SiteName', site_code),
+                    latitude=latitude,
+                    longitude=longitude,
+                    network='LAQN',
+                    site_type=site_type,
+                    borough=site.get('@LocalAuthorityName', borough),
+                    is_active=site.get('@IsClosed', 'false').lower() != 'true',
+                    metadata={
+                        'local_authority_id': site.get('@LocalAuthorityId'),
+                        'site_link': site.get('@SiteLink'),
+                        'data_owner': site.get('@DataOwner'),
                     }
                 )
-                
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
+        
+        # One query to tell new sites from ones already stored
+        existing = set(
+            Sensor.objects.filter(
+                site_code__in=to_upsert.keys()
+            ).values_list('site_code', flat=True)
+        )
+        created_count = len(to_upsert.keys() - existing)
+        updated_count = len(to_upsert) - created_count
+        
+        # Create or update - a single INSERT ... ON CONFLICT DO UPDATE
+        if to_upsert:
+            Sensor.objects.bulk_create(
+                to_upsert.values(),
+                update_conflicts=True,
+                unique_fields=['site_code'],
+                update_fields=SENSOR_FIELDS,
+                batch_size=500,
+            )
+            clear_map_cache()
         
         self.stdout.write(
             self.style.SUCCESS(
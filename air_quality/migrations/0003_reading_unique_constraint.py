@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('air_quality', '0002_remove_school_air_quality_borough_9c4490_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='reading',
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name='reading',
+            name='timestamp',
+            field=models.DateTimeField(),
+        ),
+        migrations.AddConstraint(
+            model_name='reading',
+            constraint=models.UniqueConstraint(fields=('sensor', 'timestamp'), name='uniq_reading_sensor_ts'),
+        ),
+    ]
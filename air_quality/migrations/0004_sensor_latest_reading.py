@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('air_quality', '0003_reading_unique_constraint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sensor',
+            name='last_no2',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sensor',
+            name='last_nox',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sensor',
+            name='last_o3',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sensor',
+            name='last_pm10',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sensor',
+            name='last_pm25',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sensor',
+            name='last_reading_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:49
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('air_quality', '0004_sensor_latest_reading'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reading',
+            name='created_at',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False),
+        ),
+    ]
@@ -12,9 +12,16 @@ Data sources:
 """
 
 from django.db import models
+from django.db.models.functions import Now
 from django.utils import timezone
 
 
+# Sensor columns holding a copy of its latest reading
+LATEST_READING_FIELDS = [
+    'last_reading_at', 'last_no2', 'last_pm25', 'last_pm10', 'last_o3', 'last_nox',
+]
+
+
 class Sensor(models.Model):
     """
     Air quality monitoring sensor/station.
@@ -58,6 +65,15 @@ class Sensor(models.Model):
     # Network-specific metadata (JSON)
     metadata = models.JSONField(default=dict, blank=True)
     
+    # Latest reading, copied here by the fetch commands so it can be read
+    # without querying the readings table
+    last_reading_at = models.DateTimeField(null=True, blank=True)
+    last_no2 = models.FloatField(null=True, blank=True)
+    last_pm25 = models.FloatField(null=True, blank=True)
+    last_pm10 = models.FloatField(null=True, blank=True)
+    last_o3 = models.FloatField(null=True, blank=True)
+    last_nox = models.FloatField(null=True, blank=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -84,8 +100,70 @@ class Sensor(models.Model):
         return self.site_type == 'urban_background'
     
     def get_latest_reading(self):
-        """Get most recent reading from this sensor."""
-        return self.readings.order_by('-timestamp').first()
+        """
+        Get most recent reading from this sensor.
+        
+        Built from the last_* columns when they are set, so no query is
+        needed; sensors not fetched since they were added fall back to
+        the readings table. The returned Reading is not saved.
+        
+        Saving or deleting a Reading keeps the columns current through
+        signals; code writing readings in bulk must call
+        record_latest_readings() itself.
+        """
+        if self.last_reading_at is None:
+            return self.readings.order_by('-timestamp').first()
+        
+        return Reading(
+            sensor=self,
+            timestamp=self.last_reading_at,
+            no2=self.last_no2,
+            pm25=self.last_pm25,
+            pm10=self.last_pm10,
+            o3=self.last_o3,
+            nox=self.last_nox,
+        )
+    
+    def get_latest_annual_stats(self):
+        """
+        Get the most recent annual statistics for this sensor.
+        
+        Uses the stats prefetched by School.with_air_quality() when present.
+        """
+        prefetched = getattr(self, 'annual_stats_by_year', None)
+        if prefetched is not None:
+            return prefetched[0] if prefetched else None
+        return self.annual_stats.order_by('-year').first()
+    
+    @classmethod
+    def record_latest_readings(cls, readings):
+        """
+        Copy the newest of the given readings onto each sensor's last_* columns.
+        
+        Sensors already holding a newer reading are left alone, so fetching
+        an older window never moves the latest reading backwards.
+        """
+        latest = {}
+        for reading in readings:
+            current = latest.get(reading.sensor_id)
+            if current is None or reading.timestamp > current.timestamp:
+                latest[reading.sensor_id] = reading
+        
+        sensors = []
+        for sensor in cls.objects.filter(pk__in=latest).only('id', 'last_reading_at'):
+            reading = latest[sensor.id]
+            if sensor.last_reading_at and sensor.last_reading_at > reading.timestamp:
+                continue
+            
+            sensor.last_reading_at = reading.timestamp
+            sensor.last_no2 = reading.no2
+            sensor.last_pm25 = reading.pm25
+            sensor.last_pm10 = reading.pm10
+            sensor.last_o3 = reading.o3
+            sensor.last_nox = reading.nox
+            sensors.append(sensor)
+        
+        cls.objects.bulk_update(sensors, LATEST_READING_FIELDS, batch_size=500)
 
 
 class Reading(models.Model):
@@ -101,7 +179,9 @@ class Reading(models.Model):
         on_delete=models.CASCADE,
         related_name='readings'
     )
-    timestamp = models.DateTimeField(db_index=True)
+    # No index of its own - every lookup is per sensor, which the
+    # (sensor, timestamp) constraint and index below already cover
+    timestamp = models.DateTimeField()
     
     # Pollutant concentrations (µg/m³)
     no2 = models.FloatField(null=True, blank=True, help_text='NO₂ µg/m³')
@@ -113,10 +193,16 @@ class Reading(models.Model):
     # Data quality flag
     is_provisional = models.BooleanField(default=True)
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set by the database, so bulk inserts don't send a timestamp per row
+    created_at = models.DateTimeField(db_default=Now(), editable=False)
     
     class Meta:
-        unique_together = ['sensor', 'timestamp']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['sensor', 'timestamp'],
+                name='uniq_reading_sensor_ts'
+            ),
+        ]
         ordering = ['-timestamp']
         indexes = [
             models.Index(fields=['sensor', '-timestamp']),
@@ -8,9 +8,13 @@ API Documentation: https://www.breathelondon.org/developers
 """
 
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timezone
 from typing import Optional
 import logging
+from air_quality import jsonutil
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,9 @@ class BreatheLondonApi:
     Client for accessing Breathe London sensor data via their official API.
     """
     
+    # Matches the most --workers the fetch commands are expected to use
+    POOL_SIZE = 16
+    
     BASE_URL = "https://breathe-london-7x54d7qf.ew.gateway.dev"
     
     def __init__(self, api_key: str):
@@ -36,6 +43,15 @@ class BreatheLondonApi:
             "Content-Type": "application/json",
             "Accept": "application/json"
         })
+        
+        # One pooled, keep-alive connection per concurrent fetch thread.
+        # Only connection failures and gateway errors are retried - other
+        # error responses are left for _make_request to inspect.
+        adapter = HTTPAdapter(
+            pool_maxsize=self.POOL_SIZE,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount("https://", adapter)
     
     def _make_request(self, endpoint: str, params: Optional[dict] = None) -> dict:
         """Make authenticated request to Breathe London API."""
@@ -44,8 +60,8 @@ class BreatheLondonApi:
         try:
             response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return jsonutil.loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"API request failed: {e}")
             raise
     
@@ -65,11 +81,16 @@ class BreatheLondonApi:
         if boroughs is None:
             boroughs = ["Lambeth", "Southwark"]
         
+        # One request per borough, sent concurrently over the shared
+        # session; map() keeps the results in borough order
+        with ThreadPoolExecutor(max_workers=min(len(boroughs), self.POOL_SIZE) or 1) as executor:
+            responses = list(executor.map(
+                lambda borough: self._make_request("ListSensors", {"Borough": borough}),
+                boroughs
+            ))
+        
         all_sensors = []
-        for borough in boroughs:
-            params = {"Borough": borough}
-            data = self._make_request("ListSensors", params)
-            
+        for borough, data in zip(boroughs, responses):
             # API returns list directly
             if isinstance(data, list):
                 all_sensors.extend(data)
@@ -8,13 +8,43 @@ API Documentation: https://www.londonair.org.uk/LondonAir/API/
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 from typing import Optional, List
 import logging
+from air_quality import jsonutil
 
 logger = logging.getLogger(__name__)
 
 
+# Map species codes to match the annual objectives API response
+ANNUAL_SPECIES_MAP = {
+    "NO2": "NO2",
+    "PM25": "PM2.5",
+    "PM10": "DUST",  # PM10 reported as DUST in API
+    "O3": "O3"
+}
+
+
+# English month abbreviations for LAQN dates - strftime("%b") follows the
+# process locale, which the API does not accept
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _format_laqn_date(value: datetime) -> str:
+    """Format a date as LAQN expects it, e.g. 05-Mar-2024."""
+    return f"{value.day:02d}-{_MONTHS[value.month - 1]}-{value.year}"
+
+
+def _as_list(value) -> list:
+    """LAQN returns a lone item as a dict rather than a one-item list."""
+    if isinstance(value, dict):
+        return [value]
+    return value or []
+
+
 class LAQNApi:
     """
     Client for accessing LAQN monitoring data.
@@ -23,6 +53,9 @@ class LAQNApi:
     boroughs and provide the most accurate readings available.
     """
     
+    # Matches the most --workers the fetch commands are expected to use
+    POOL_SIZE = 16
+    
     BASE_URL = "https://api.erg.ic.ac.uk/AirQuality"
     
     def __init__(self):
@@ -31,6 +64,15 @@ class LAQNApi:
         self.session.headers.update({
             "Accept": "application/json"
         })
+        
+        # One pooled, keep-alive connection per concurrent fetch thread.
+        # Only connection failures and gateway errors are retried - other
+        # error responses are left for _make_request to inspect.
+        adapter = HTTPAdapter(
+            pool_maxsize=self.POOL_SIZE,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount("https://", adapter)
     
     def _make_request(self, endpoint: str, params: Optional[dict] = None) -> dict:
         """Make request to LAQN API."""
@@ -39,8 +81,8 @@ class LAQNApi:
         try:
             response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return jsonutil.loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             # Check if the error response contains "no row at position 0"
             # This indicates the LAQN database has no data for this request
             if hasattr(e, 'response') and e.response is not None:
@@ -73,19 +115,17 @@ class LAQNApi:
         data = self._make_request("Information/MonitoringSiteSpecies/GroupName=London")
         
         # Handle LAQN's quirky response format
-        sites = data.get("Sites", {}).get("Site", [])
-        
-        # Ensure it's always a list (single item comes as dict)
-        if isinstance(sites, dict):
-            sites = [sites]
+        sites = _as_list(data.get("Sites", {}).get("Site"))
         
         # Filter by borough if specified
         if borough:
-            sites = [s for s in sites if s.get("@LocalAuthorityName", "").lower() == borough.lower()]
+            borough = borough.lower()
+            sites = [s for s in sites if s.get("@LocalAuthorityName", "").lower() == borough]
         
         # Filter by site type if specified
         if site_type:
-            sites = [s for s in sites if site_type.lower() in s.get("@SiteType", "").lower()]
+            site_type = site_type.lower()
+            sites = [s for s in sites if site_type in s.get("@SiteType", "").lower()]
         
         return sites
     
@@ -127,8 +167,8 @@ class LAQNApi:
             end_date = datetime.now()
         
         # Format dates for LAQN API (DD-Mon-YYYY format required)
-        start_str = start_date.strftime("%d-%b-%Y")
-        end_str = end_date.strftime("%d-%b-%Y")
+        start_str = _format_laqn_date(start_date)
+        end_str = _format_laqn_date(end_date)
         
         # Use Data/Site endpoint (not Data/SiteSpecies)
         endpoint = f"Data/Site/SiteCode={site_code}/StartDate={start_str}/EndDate={end_str}"
@@ -146,10 +186,7 @@ class LAQNApi:
         
         # Parse the response - Data/Site returns different structure
         readings = []
-        data_items = data.get("AirQualityData", {}).get("Data", [])
-        
-        if isinstance(data_items, dict):
-            data_items = [data_items]
+        data_items = _as_list(data.get("AirQualityData", {}).get("Data"))
         
         for item in data_items:
             species_code = item.get("@SpeciesCode")
@@ -190,25 +227,19 @@ class LAQNApi:
         
         data = self._make_request(endpoint)
         
-        sites = data.get("HourlyAirQualityIndex", {}).get("LocalAuthority", [])
-        if isinstance(sites, dict):
-            sites = [sites]
+        sites = _as_list(data.get("HourlyAirQualityIndex", {}).get("LocalAuthority"))
         
         readings = []
         for authority in sites:
-            site_list = authority.get("Site", [])
-            if isinstance(site_list, dict):
-                site_list = [site_list]
-            
-            for site in site_list:
-                species = site.get("Species", [])
-                if isinstance(species, dict):
-                    species = [species]
+            for site in _as_list(authority.get("Site")):
+                # Shared by every species at this site
+                site_code = site.get("@SiteCode")
+                site_name = site.get("@SiteName")
                 
-                for s in species:
+                for s in _as_list(site.get("Species")):
                     readings.append({
-                        'site_code': site.get("@SiteCode"),
-                        'site_name': site.get("@SiteName"),
+                        'site_code': site_code,
+                        'site_name': site_name,
                         'species': s.get("@SpeciesCode"),
                         'value': s.get("@AirQualityIndex"),
                         'band': s.get("@AirQualityBand"),
@@ -233,6 +264,29 @@ class LAQNApi:
         Returns:
             Annual mean in µg/m³ or None
         """
+        return self.get_annual_means(site_code, year, (species,))[species]
+    
+    def get_annual_means(
+        self,
+        site_code: str,
+        year: int,
+        species: tuple = ("NO2", "PM25", "PM10", "O3")
+    ) -> dict:
+        """
+        Get annual mean concentrations for several pollutants at once.
+        
+        The annual objectives endpoint returns every species for a site, so
+        one request covers all of them.
+        
+        Args:
+            site_code: Site code
+            year: Year to retrieve
+            species: Pollutant codes (NO2, PM25, PM10, O3)
+            
+        Returns:
+            Dict of species code -> annual mean in µg/m³ or None
+        """
+        means = dict.fromkeys(species)
         endpoint = f"Annual/MonitoringObjective/SiteCode={site_code}/Year={year}"
         
         try:
@@ -240,39 +294,30 @@ class LAQNApi:
             
             # Navigate to objectives list
             site_data = data.get("SiteObjectives", {}).get("Site", {})
-            objectives = site_data.get("Objective", [])
-            
-            if isinstance(objectives, dict):
-                objectives = [objectives]
-            
-            # Map species codes to match API response
-            species_map = {
-                "NO2": "NO2",
-                "PM25": "PM2.5",
-                "PM10": "DUST",  # PM10 reported as DUST in API
-                "O3": "O3"
-            }
+            objectives = _as_list(site_data.get("Objective"))
             
-            target_species = species_map.get(species, species)
+            # API species code -> requested species code
+            targets = {ANNUAL_SPECIES_MAP.get(s, s): s for s in species}
             
             # Find the annual mean objective (not exceedances or capture rate)
             for obj in objectives:
-                obj_species = obj.get("@SpeciesCode")
-                obj_name = obj.get("@ObjectiveName", "").lower()
+                target = targets.get(obj.get("@SpeciesCode"))
+                if target is None or means[target] is not None:
+                    continue
                 
-                if obj_species == target_species and "annual mean" in obj_name:
+                obj_name = obj.get("@ObjectiveName", "").lower()
+                if "annual mean" in obj_name:
                     value = obj.get("@Value")
                     if value:
                         try:
-                            return float(value)
+                            means[target] = float(value)
                         except (ValueError, TypeError):
                             continue
             
         except Exception as e:
             logger.warning(f"Could not get annual mean for {site_code} {year}: {e}")
         
-        return None
-
+        return means
 
 def test_connection() -> bool:
     """Test LAQN API connection."""
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import LATEST_READING_FIELDS, Reading, Sensor
+
+
+@receiver(post_save, sender=Reading)
+def reading_saved(sender, instance, **kwargs):
+    """Keep the sensor's latest reading current when a single reading is saved"""
+    Sensor.record_latest_readings([instance])
+
+
+@receiver(post_delete, sender=Reading)
+def reading_deleted(sender, instance, **kwargs):
+    """Forget a deleted latest reading so get_latest_reading queries instead"""
+    Sensor.objects.filter(
+        pk=instance.sensor_id, last_reading_at=instance.timestamp
+    ).update(**dict.fromkeys(LATEST_READING_FIELDS))
@@ -1,3 +1,500 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.utils import timezone
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+from air_quality.models import Sensor, Reading, SensorAnnualStats
+from air_quality.services.breathe_london_api import BreatheLondonApi
+from air_quality.services.laqn_api import LAQNApi
+from maps.cache import MAP_CACHE_KEY
+from schools.models import School
 
 # Create your tests here.
+class AssignSensorsCommandTest(TestCase):
+    """Test cases for the assign_sensors management command"""
+
+    def setUp(self):
+        """Create a school with a nearby urban background sensor and LAQN sensors"""
+        self.school = School.objects.create(
+            name="Near School",
+            address="1 Test St",
+            city="London",
+            postcode="SE1 1AA",
+            latitude=Decimal("51.500000"),
+            longitude=Decimal("-0.100000"),
+            school_type="primary"
+        )
+        self.far_school = School.objects.create(
+            name="Far School",
+            address="2 Test Ave",
+            city="London",
+            postcode="SE2 2BB",
+            latitude=Decimal("51.700000"),
+            longitude=Decimal("-0.100000"),
+            school_type="primary"
+        )
+        # ~100m north of Near School
+        self.breathe = Sensor.objects.create(
+            site_code="BL0001", name="Breathe Park",
+            latitude=51.5009, longitude=-0.1,
+            network='BREATHE', site_type='urban_background'
+        )
+        # ~50m north of Near School, but roadside so never direct
+        self.roadside = Sensor.objects.create(
+            site_code="LB1", name="Roadside LAQN",
+            latitude=51.50045, longitude=-0.1,
+            network='LAQN', site_type='roadside'
+        )
+        # ~1km north of Near School
+        self.background = Sensor.objects.create(
+            site_code="LB2", name="Background LAQN",
+            latitude=51.509, longitude=-0.1,
+            network='LAQN', site_type='urban_background'
+        )
+
+    def test_direct_and_reference_assignment(self):
+        """Test nearest urban background sensor is direct and nearest LAQN is reference"""
+        call_command('assign_sensors', stdout=StringIO())
+        self.school.refresh_from_db()
+        self.assertEqual(self.school.data_source, 'DIRECT')
+        self.assertEqual(self.school.direct_sensor, self.breathe)
+        self.assertEqual(self.school.reference_sensor, self.roadside)
+        self.assertAlmostEqual(float(self.school.direct_sensor_distance), 100.1, delta=1)
+        self.assertAlmostEqual(float(self.school.reference_sensor_distance), 50.0, delta=1)
+
+    def test_school_out_of_range_is_laei_only(self):
+        """Test schools beyond both thresholds fall back to LAEI"""
+        call_command('assign_sensors', stdout=StringIO())
+        self.far_school.refresh_from_db()
+        self.assertEqual(self.far_school.data_source, 'LAEI')
+        self.assertIsNone(self.far_school.direct_sensor)
+        self.assertIsNone(self.far_school.reference_sensor)
+
+    def test_adjusted_when_no_direct_sensor(self):
+        """Test schools with only a reference sensor in range are ADJUSTED"""
+        self.breathe.delete()
+        call_command('assign_sensors', stdout=StringIO())
+        self.school.refresh_from_db()
+        self.assertEqual(self.school.data_source, 'ADJUSTED')
+        self.assertIsNone(self.school.direct_sensor)
+        self.assertEqual(self.school.reference_sensor, self.roadside)
+
+    def test_dry_run_saves_nothing(self):
+        """Test that --dry-run leaves schools untouched"""
+        call_command('assign_sensors', dry_run=True, stdout=StringIO())
+        self.school.refresh_from_db()
+        self.assertEqual(self.school.data_source, 'LAEI')
+        self.assertIsNone(self.school.direct_sensor)
+
+
+@override_settings(BREATHE_LONDON_API_KEY='test-key')
+class FetchBreatheReadingsCommandTest(TestCase):
+    """Test cases for the fetch_breathe_readings management command"""
+
+    def setUp(self):
+        """Create a Breathe London sensor and a sample API response"""
+        self.sensor = Sensor.objects.create(
+            site_code="BL0001", name="Breathe Park",
+            latitude=51.5, longitude=-0.1,
+            network='BREATHE', site_type='urban_background'
+        )
+        self.sensor_data = [
+            {'DateTime': '2026-01-25T10:00:00Z', 'Species': 'NO2', 'ScaledValue': 21.5},
+            {'DateTime': '2026-01-25T10:00:00Z', 'Species': 'PM2.5', 'ScaledValue': 8.2},
+            {'DateTime': '2026-01-25T11:00:00Z', 'Species': 'NO2', 'ScaledValue': 25.0},
+            {'DateTime': '2026-01-25T11:00:00Z', 'Species': 'PM10', 'ScaledValue': None},
+        ]
+
+    @patch('air_quality.services.breathe_london_api.BreatheLondonApi.get_sensor_data')
+    def test_readings_grouped_by_hour(self, mock_get_sensor_data):
+        """Test that data points are combined into one reading per hour"""
+        mock_get_sensor_data.return_value = self.sensor_data
+        call_command('fetch_breathe_readings', stdout=StringIO())
+        readings = Reading.objects.filter(sensor=self.sensor).order_by('timestamp')
+        self.assertEqual(readings.count(), 2)
+        self.assertEqual(readings[0].no2, 21.5)
+        self.assertEqual(readings[0].pm25, 8.2)
+        self.assertEqual(readings[1].no2, 25.0)
+        self.assertIsNone(readings[1].pm10)
+
+    @patch('air_quality.services.breathe_london_api.BreatheLondonApi.get_sensor_data')
+    def test_refetch_updates_existing_readings(self, mock_get_sensor_data):
+        """Test that fetching the same hour again updates rather than duplicates"""
+        mock_get_sensor_data.return_value = self.sensor_data
+        call_command('fetch_breathe_readings', stdout=StringIO())
+        mock_get_sensor_data.return_value = [
+            {'DateTime': '2026-01-25T10:00:00Z', 'Species': 'NO2', 'ScaledValue': 30.0},
+        ]
+        out = StringIO()
+        call_command('fetch_breathe_readings', stdout=out)
+        self.assertEqual(Reading.objects.filter(sensor=self.sensor).count(), 2)
+        self.assertEqual(Reading.objects.get(sensor=self.sensor, timestamp__hour=10).no2, 30.0)
+        self.assertIn('0 readings created', out.getvalue())
+
+    @patch('air_quality.services.breathe_london_api.BreatheLondonApi.get_sensor_data')
+    def test_api_error_is_counted(self, mock_get_sensor_data):
+        """Test that a failing sensor request is reported, not raised"""
+        mock_get_sensor_data.side_effect = ValueError('boom')
+        out = StringIO()
+        call_command('fetch_breathe_readings', stdout=out)
+        self.assertIn('(1 errors)', out.getvalue())
+        self.assertFalse(Reading.objects.exists())
+
+
+class FetchAnnualStatsCommandTest(TestCase):
+    """Test cases for the fetch_annual_stats management command"""
+
+    def setUp(self):
+        """Create LAQN sensors, one with existing stats"""
+        self.sensor = Sensor.objects.create(
+            site_code="LB4", name="Lambeth - Brixton Road",
+            latitude=51.46, longitude=-0.11,
+            network='LAQN', site_type='roadside'
+        )
+        self.other = Sensor.objects.create(
+            site_code="SK5", name="Southwark - A2 Old Kent Road",
+            latitude=51.48, longitude=-0.06,
+            network='LAQN', site_type='roadside'
+        )
+        SensorAnnualStats.objects.create(sensor=self.other, year=2024, no2_mean=30.0)
+        self.means = {'NO2': 35.0, 'PM25': 9.5, 'PM10': 18.0, 'O3': None}
+        self.objectives = {'SiteObjectives': {'Site': {'Objective': [
+            {'@SpeciesCode': 'NO2', '@ObjectiveName': '40 ug/m3 as an annual mean', '@Value': '35.0'},
+            {'@SpeciesCode': 'NO2', '@ObjectiveName': '200 ug/m3 as a 1 hour mean', '@Value': '0'},
+            {'@SpeciesCode': 'PM2.5', '@ObjectiveName': 'Annual mean > 25 ug/m3', '@Value': '9.5'},
+            {'@SpeciesCode': 'DUST', '@ObjectiveName': '40 ug/m3 as an annual mean', '@Value': '18.0'},
+        ]}}}
+
+    @patch('air_quality.services.laqn_api.LAQNApi._make_request')
+    def test_creates_stats_and_skips_existing(self, mock_make_request):
+        """Test new stats are created and existing ones are left alone"""
+        mock_make_request.return_value = self.objectives
+        out = StringIO()
+        call_command('fetch_annual_stats', year=[2024], stdout=out)
+        stats = SensorAnnualStats.objects.get(sensor=self.sensor, year=2024)
+        self.assertEqual(stats.no2_mean, 35.0)
+        self.assertEqual(stats.pm25_mean, 9.5)
+        self.assertIsNone(stats.o3_mean)
+        self.assertEqual(SensorAnnualStats.objects.get(sensor=self.other, year=2024).no2_mean, 30.0)
+        self.assertIn('Created: 1', out.getvalue())
+        self.assertIn('Skipped: 1', out.getvalue())
+        # One request covers all four pollutants
+        self.assertEqual(mock_make_request.call_count, 1)
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_annual_means')
+    def test_overwrite_updates_existing(self, mock_get_annual_means):
+        """Test --overwrite replaces existing stats"""
+        mock_get_annual_means.return_value = self.means
+        out = StringIO()
+        call_command('fetch_annual_stats', year=[2024], overwrite=True, stdout=out)
+        self.assertEqual(SensorAnnualStats.objects.get(sensor=self.other, year=2024).no2_mean, 35.0)
+        self.assertEqual(SensorAnnualStats.objects.count(), 2)
+        self.assertIn('Updated: 1', out.getvalue())
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_annual_means')
+    def test_no_data_is_skipped(self, mock_get_annual_means):
+        """Test sensors with no annual means are not saved"""
+        mock_get_annual_means.return_value = dict.fromkeys(self.means)
+        call_command('fetch_annual_stats', year=[2024], sensor='LB4', stdout=StringIO())
+        self.assertFalse(SensorAnnualStats.objects.filter(sensor=self.sensor).exists())
+
+
+class FetchLaqnReadingsCommandTest(TestCase):
+    """Test cases for the fetch_laqn_readings management command"""
+
+    def setUp(self):
+        """Create LAQN sensors and a sample API response"""
+        self.sensor = Sensor.objects.create(
+            site_code="LB4", name="Lambeth - Brixton Road",
+            latitude=51.46, longitude=-0.11,
+            network='LAQN', site_type='roadside'
+        )
+        self.other = Sensor.objects.create(
+            site_code="SK5", name="Southwark - A2 Old Kent Road",
+            latitude=51.48, longitude=-0.06,
+            network='LAQN', site_type='roadside'
+        )
+        self.raw_readings = [
+            {'species': 'NO2', 'timestamp': '2026-01-25 10:00:00', 'value': '41.2'},
+            {'species': 'PM25', 'timestamp': '2026-01-25 10:00:00', 'value': '7.5'},
+            {'species': 'NO2', 'timestamp': '2026-01-25 11:00:00', 'value': '38.0'},
+            {'species': 'CO', 'timestamp': '2026-01-25 11:00:00', 'value': '0.3'},
+            {'species': 'NO2', 'timestamp': '2026-01-25 12:00:00', 'value': ''},
+        ]
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_hourly_readings')
+    def test_readings_saved_for_every_sensor(self, mock_get_hourly_readings):
+        """Test that readings are grouped by hour and saved for all sensors"""
+        mock_get_hourly_readings.return_value = self.raw_readings
+        out = StringIO()
+        call_command('fetch_laqn_readings', stdout=out)
+        readings = Reading.objects.filter(sensor=self.sensor).order_by('timestamp')
+        self.assertEqual(readings.count(), 2)
+        self.assertEqual(readings[0].no2, 41.2)
+        self.assertEqual(readings[0].pm25, 7.5)
+        self.assertEqual(readings[1].no2, 38.0)
+        self.assertEqual(Reading.objects.filter(sensor=self.other).count(), 2)
+        self.assertIn('4 readings created from 2 sensors', out.getvalue())
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_hourly_readings')
+    def test_refetch_updates_existing_readings(self, mock_get_hourly_readings):
+        """Test that fetching the same hour again updates rather than duplicates"""
+        mock_get_hourly_readings.return_value = self.raw_readings
+        call_command('fetch_laqn_readings', sensor='LB4', stdout=StringIO())
+        mock_get_hourly_readings.return_value = [
+            {'species': 'NO2', 'timestamp': '2026-01-25 10:00:00', 'value': '45.0'},
+        ]
+        out = StringIO()
+        call_command('fetch_laqn_readings', sensor='LB4', stdout=out)
+        self.assertEqual(Reading.objects.filter(sensor=self.sensor).count(), 2)
+        self.assertEqual(Reading.objects.get(sensor=self.sensor, timestamp__hour=10).no2, 45.0)
+        self.assertIn('0 readings created', out.getvalue())
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_hourly_readings')
+    def test_latest_reading_copied_to_sensor(self, mock_get_hourly_readings):
+        """Test the newest reading is stored on the sensor and never moves backwards"""
+        mock_get_hourly_readings.return_value = self.raw_readings
+        call_command('fetch_laqn_readings', sensor='LB4', stdout=StringIO())
+        self.sensor.refresh_from_db()
+        self.assertEqual(self.sensor.last_reading_at.hour, 11)
+        self.assertEqual(self.sensor.last_no2, 38.0)
+        with self.assertNumQueries(0):
+            latest = self.sensor.get_latest_reading()
+        self.assertEqual(latest.timestamp, self.sensor.last_reading_at)
+        self.assertEqual(latest.no2, 38.0)
+        # An older window updates the reading but not the sensor
+        mock_get_hourly_readings.return_value = self.raw_readings[:1]
+        call_command('fetch_laqn_readings', sensor='LB4', stdout=StringIO())
+        self.sensor.refresh_from_db()
+        self.assertEqual(self.sensor.last_reading_at.hour, 11)
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_hourly_readings')
+    def test_map_cache_cleared(self, mock_get_hourly_readings):
+        """Test new readings drop the cached map data"""
+        cache.set(MAP_CACHE_KEY, {'schools_json': '[]'})
+        mock_get_hourly_readings.return_value = self.raw_readings
+        call_command('fetch_laqn_readings', sensor='LB4', stdout=StringIO())
+        self.assertIsNone(cache.get(MAP_CACHE_KEY))
+
+    def test_latest_reading_falls_back_to_query(self):
+        """Test sensors without a stored latest reading query their readings"""
+        self.assertIsNone(self.sensor.get_latest_reading())
+        # bulk_create sends no signals, so the sensor's columns stay empty
+        Reading.objects.bulk_create([
+            Reading(sensor=self.sensor, timestamp=timezone.now(), no2=20.0)
+        ])
+        self.sensor.refresh_from_db()
+        self.assertIsNone(self.sensor.last_reading_at)
+        self.assertEqual(self.sensor.get_latest_reading().no2, 20.0)
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_hourly_readings')
+    def test_latest_reading_follows_single_saves(self, mock_get_hourly_readings):
+        """Test readings saved or deleted outside the fetch commands update the sensor"""
+        mock_get_hourly_readings.return_value = self.raw_readings
+        call_command('fetch_laqn_readings', sensor='LB4', stdout=StringIO())
+        newer = Reading.objects.create(
+            sensor=self.sensor, timestamp=timezone.now(), no2=55.0
+        )
+        self.sensor.refresh_from_db()
+        self.assertEqual(self.sensor.get_latest_reading().no2, 55.0)
+        newer.delete()
+        self.sensor.refresh_from_db()
+        self.assertIsNone(self.sensor.last_reading_at)
+        self.assertEqual(self.sensor.get_latest_reading().no2, 38.0)
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_hourly_readings')
+    def test_no_data_and_errors_are_counted(self, mock_get_hourly_readings):
+        """Test that empty responses and failing requests are reported, not raised"""
+        mock_get_hourly_readings.side_effect = [[], ValueError('boom')]
+        out = StringIO()
+        call_command('fetch_laqn_readings', stdout=out)
+        self.assertIn('(1 no data, 1 errors)', out.getvalue())
+        self.assertFalse(Reading.objects.exists())
+
+
+class SyncLaqnSensorsCommandTest(TestCase):
+    """Test cases for the sync_laqn_sensors management command"""
+
+    def setUp(self):
+        """Create an existing sensor and a sample list of monitoring sites"""
+        self.existing = Sensor.objects.create(
+            site_code="LB4", name="Old Name",
+            latitude=51.46, longitude=-0.11,
+            network='LAQN', site_type='roadside'
+        )
+        self.sites = [
+            {'@SiteCode': 'LB4', '@SiteName': 'Lambeth - Brixton Road',
+             '@Latitude': '51.4646', '@Longitude': '-0.1149',
+             '@SiteType': 'Kerbside', '@LocalAuthorityName': 'Lambeth'},
+            {'@SiteCode': 'LB6', '@SiteName': 'Lambeth - Streatham Green',
+             '@Latitude': '51.4289', '@Longitude': '-0.1318',
+             '@SiteType': 'Urban Background', '@LocalAuthorityName': 'Lambeth',
+             '@IsClosed': 'true'},
+            {'@SiteCode': 'LB9', '@SiteName': 'No Coordinates',
+             '@Latitude': '', '@Longitude': ''},
+        ]
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_monitoring_sites')
+    def test_sites_created_and_updated(self, mock_get_monitoring_sites):
+        """Test new sites are created and existing ones updated in place"""
+        mock_get_monitoring_sites.return_value = self.sites
+        out = StringIO()
+        call_command('sync_laqn_sensors', borough=['Lambeth'], stdout=out)
+        self.assertIn('1 created, 1 updated', out.getvalue())
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.name, 'Lambeth - Brixton Road')
+        new = Sensor.objects.get(site_code='LB6')
+        self.assertEqual(new.site_type, 'urban_background')
+        self.assertFalse(new.is_active)
+        self.assertFalse(Sensor.objects.filter(site_code='LB9').exists())
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_monitoring_sites')
+    def test_repeated_borough_saved_once(self, mock_get_monitoring_sites):
+        """Test a site returned for two boroughs is only saved once"""
+        mock_get_monitoring_sites.return_value = self.sites
+        out = StringIO()
+        call_command('sync_laqn_sensors', borough=['Lambeth', 'Lambeth'], stdout=out)
+        self.assertIn('1 created, 1 updated', out.getvalue())
+        self.assertEqual(Sensor.objects.count(), 2)
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_monitoring_sites')
+    def test_sites_fetched_once_for_all_boroughs(self, mock_get_monitoring_sites):
+        """Test that several boroughs are served from a single API request"""
+        mock_get_monitoring_sites.return_value = self.sites + [
+            {'@SiteCode': 'SK5', '@SiteName': 'Southwark - A2 Old Kent Road',
+             '@Latitude': '51.4805', '@Longitude': '-0.0596',
+             '@SiteType': 'Roadside', '@LocalAuthorityName': 'Southwark'},
+        ]
+        out = StringIO()
+        call_command('sync_laqn_sensors', borough=['lambeth', 'Southwark'], stdout=out)
+        self.assertEqual(mock_get_monitoring_sites.call_count, 1)
+        self.assertIn('2 created, 1 updated', out.getvalue())
+        self.assertEqual(Sensor.objects.get(site_code='SK5').borough, 'Southwark')
+
+    @patch('air_quality.services.laqn_api.LAQNApi.get_monitoring_sites')
+    def test_all_syncs_every_borough(self, mock_get_monitoring_sites):
+        """Test --all covers boroughs beyond the Lambeth and Southwark default"""
+        mock_get_monitoring_sites.return_value = self.sites + [
+            {'@SiteCode': 'CD9', '@SiteName': 'Camden - Euston Road',
+             '@Latitude': '51.5276', '@Longitude': '-0.1290',
+             '@SiteType': 'Roadside', '@LocalAuthorityName': 'Camden'},
+        ]
+        out = StringIO()
+        call_command('sync_laqn_sensors', all=True, borough=['Lambeth'], stdout=out)
+        self.assertIn('Syncing LAQN sensors for: Camden, Lambeth', out.getvalue())
+        self.assertEqual(Sensor.objects.get(site_code='CD9').borough, 'Camden')
+        self.assertEqual(Sensor.objects.count(), 3)
+
+
+@override_settings(BREATHE_LONDON_API_KEY='test-key')
+class SyncBreatheSensorsCommandTest(TestCase):
+    """Test cases for the sync_breathe_sensors management command"""
+
+    def setUp(self):
+        """Create an LAQN sensor and a sample list of Breathe London sensors"""
+        Sensor.objects.create(
+            site_code="LB4", name="Lambeth - Brixton Road",
+            latitude=51.46, longitude=-0.11,
+            network='LAQN', site_type='roadside'
+        )
+        self.sensors = [
+            {'SiteCode': 'BL0001', 'SiteName': 'Brockwell Park', 'Latitude': 51.45,
+             'Longitude': -0.10, 'Borough': 'Lambeth', 'SiteClassification': 'Urban Background'},
+            {'SiteCode': 'BL0002', 'SiteName': 'Walworth Road', 'Latitude': 51.48,
+             'Longitude': -0.09, 'Borough': 'Southwark', 'SiteClassification': 'Kerbside'},
+            {'SiteCode': 'BL0003', 'SiteName': 'Missing Location'},
+        ]
+
+    @patch('air_quality.services.breathe_london_api.BreatheLondonApi.get_sensors_by_borough')
+    def test_sensors_created_with_summary(self, mock_get_sensors_by_borough):
+        """Test sensors are saved and the network totals are reported"""
+        mock_get_sensors_by_borough.return_value = self.sensors
+        out = StringIO()
+        call_command('sync_breathe_sensors', stdout=out)
+        self.assertEqual(Sensor.objects.get(site_code='BL0002').site_type, 'roadside')
+        self.assertFalse(Sensor.objects.filter(site_code='BL0003').exists())
+        self.assertIn('2 created, 0 updated', out.getvalue())
+        self.assertIn('LAQN (reference): 1', out.getvalue())
+        self.assertIn('Breathe London:   2', out.getvalue())
+
+
+class CheckLaqnCommandTest(TestCase):
+    """Test cases for the check_laqn management command"""
+
+    def setUp(self):
+        """Create a working LAQN sensor with readings and schools using it"""
+        sensor = Sensor.objects.create(
+            site_code="LB4", name="Brixton Road",
+            latitude=51.46, longitude=-0.11, network='LAQN'
+        )
+        Reading.objects.create(sensor=sensor, timestamp=timezone.now(), no2=30.0)
+        for name, data_source in [("Adjusted School", 'ADJUSTED'), ("Direct School", 'DIRECT')]:
+            School.objects.create(
+                name=name, address="1 Test St", city="London", postcode="SW2 1AA",
+                latitude=Decimal("51.46"), longitude=Decimal("-0.11"),
+                data_source=data_source, reference_sensor=sensor,
+                direct_sensor=sensor if data_source == 'DIRECT' else None
+            )
+
+    def test_working_report(self):
+        """Test reading counts and school totals for the working sensors"""
+        out = StringIO()
+        call_command('check_laqn', target=['working'], stdout=out)
+        output = out.getvalue()
+        self.assertIn('Readings: 1', output)
+        self.assertIn('LB6: NOT FOUND IN DATABASE', output)
+        self.assertIn('SUMMARY: 2 schools have real-time LAQN data', output)
+        self.assertNotIn('Total LAQN sensors', output)
+
+
+class BreatheLondonApiTest(TestCase):
+    """Test cases for the Breathe London API client"""
+
+    @patch('air_quality.services.breathe_london_api.BreatheLondonApi._make_request')
+    def test_sensors_by_borough_keeps_borough_order(self, mock_make_request):
+        """Test every borough is requested and results come back in borough order"""
+        mock_make_request.side_effect = lambda endpoint, params: (
+            [{'SiteCode': params['Borough']}] if params['Borough'] != 'Bexley' else {}
+        )
+        api = BreatheLondonApi('test-key')
+        sensors = api.get_sensors_by_borough(['Lambeth', 'Bexley', 'Southwark'])
+        self.assertEqual([s['SiteCode'] for s in sensors], ['Lambeth', 'Southwark'])
+        self.assertEqual(mock_make_request.call_count, 3)
+
+    @patch('air_quality.services.breathe_london_api.requests.Session.get')
+    def test_non_json_response_logged(self, mock_get):
+        """Test an HTML error page is logged like any other failed request"""
+        mock_get.return_value.content = b'<html>Service Unavailable</html>'
+        mock_get.return_value.json.side_effect = ValueError('Expecting value')
+        with self.assertLogs('air_quality.services.breathe_london_api', 'ERROR'):
+            with self.assertRaises(ValueError):
+                BreatheLondonApi('test-key')._make_request('ListSensors')
+
+
+class LAQNApiTest(TestCase):
+    """Test cases for the LAQN API client"""
+
+    @patch('air_quality.services.laqn_api.LAQNApi._make_request')
+    def test_latest_readings_handles_single_items(self, mock_make_request):
+        """Test lone authorities, sites and species given as dicts are read"""
+        mock_make_request.return_value = {'HourlyAirQualityIndex': {'LocalAuthority': [
+            {'Site': {'@SiteCode': 'LB4', '@SiteName': 'Brixton Road',
+                      'Species': {'@SpeciesCode': 'NO2', '@AirQualityIndex': '2'}}},
+            {'@LocalAuthorityName': 'Bexley'},
+        ]}}
+        readings = LAQNApi().get_latest_readings()
+        self.assertEqual(readings, [{
+            'site_code': 'LB4', 'site_name': 'Brixton Road',
+            'species': 'NO2', 'value': '2', 'band': None,
+        }])
+
+    @patch('air_quality.services.laqn_api.requests.Session.get')
+    def test_non_json_response_logged(self, mock_get):
+        """Test an HTML error page is logged like any other failed request"""
+        mock_get.return_value.content = b'<html>Service Unavailable</html>'
+        mock_get.return_value.json.side_effect = ValueError('Expecting value')
+        with self.assertLogs('air_quality.services.laqn_api', 'ERROR'):
+            with self.assertRaises(ValueError):
+                LAQNApi()._make_request('Information/MonitoringSites')
@@ -1,16 +1,16 @@
 #!/usr/bin/env python
 """Check specific school configuration"""
 
-import os
-import django
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'schools_air_quality_msp4.settings')
-django.setup()
+import _bootstrap  # noqa: F401 - sets up Django
 
 from schools.models import School
+from django.db.models import Count
 
-# Find Hill Mead
-school = School.objects.get(name='Hill Mead Primary School')
+# Find Hill Mead, with its sensors, annual stats and reading count loaded
+# up front rather than queried one by one below
+school = School.with_air_quality().annotate(
+    reference_reading_count=Count('reference_sensor__readings')
+).get(name='Hill Mead Primary School')
 
 print(f'School: {school.name}')
 print(f'Data source: {school.data_source}')
@@ -20,7 +20,7 @@ if school.reference_sensor:
     print(f'  Site code: {school.reference_sensor.site_code}')
     print(f'  Name: {school.reference_sensor.name}')
     print(f'  Distance: {school.reference_sensor_distance}m')
-    print(f'  Readings: {school.reference_sensor.readings.count()}')
+    print(f'  Readings: {school.reference_reading_count}')
     latest = school.reference_sensor.get_latest_reading()
     if latest:
         print(f'  Latest reading: {latest.timestamp}')
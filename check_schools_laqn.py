@@ -1,54 +1,47 @@
 #!/usr/bin/env python
 """Check which schools are using LAQN sensor data"""
 
-import os
-import django
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'schools_air_quality_msp4.settings')
-django.setup()
+import _bootstrap  # noqa: F401 - sets up Django
 
 from schools.models import School
-from air_quality.models import Sensor
+from django.db.models import Count
 
 # Schools with direct LAQN sensor readings
+# The sensor and its reading count come back in the same query as the school
 direct_laqn = School.objects.filter(
     data_source='DIRECT',
     direct_sensor__isnull=False
-)
+).select_related('direct_sensor').annotate(
+    reading_count=Count('direct_sensor__readings')
+).only('name', 'direct_sensor__name', 'direct_sensor__network').order_by('name')
 
-print(f'Schools with DIRECT LAQN sensor readings: {direct_laqn.count()}')
-if direct_laqn.exists():
+direct_count = direct_laqn.count()
+print(f'Schools with DIRECT LAQN sensor readings: {direct_count}')
+if direct_count:
     print('\nSchools using direct LAQN data:')
-    for school in direct_laqn:
-        try:
-            sensor = Sensor.objects.get(site_code=school.direct_sensor)
-            reading_count = sensor.readings.count()
-            print(f'\n  {school.name}')
-            print(f'    Sensor: {school.direct_sensor} ({sensor.network})')
-            print(f'    Readings available: {reading_count}')
-        except Sensor.DoesNotExist:
-            print(f'\n  {school.name}')
-            print(f'    Sensor: {school.direct_sensor} (not found in database)')
+    for school in direct_laqn.iterator(chunk_size=500):
+        sensor = school.direct_sensor
+        print(f'\n  {school.name}')
+        print(f'    Sensor: {sensor} ({sensor.network})')
+        print(f'    Readings available: {school.reading_count}')
 
 # Schools with adjusted data using LAQN reference sensor
 adjusted_laqn = School.objects.filter(
     data_source='ADJUSTED',
     reference_sensor__isnull=False
-)
+).select_related('reference_sensor').annotate(
+    reading_count=Count('reference_sensor__readings')
+).only('name', 'reference_sensor__name', 'reference_sensor__network').order_by('name')
 
-print(f'\n\nSchools with ADJUSTED data using LAQN reference sensors: {adjusted_laqn.count()}')
-if adjusted_laqn.exists():
+adjusted_count = adjusted_laqn.count()
+print(f'\n\nSchools with ADJUSTED data using LAQN reference sensors: {adjusted_count}')
+if adjusted_count:
     print('\nSample schools using LAQN for adjustment (first 5):')
     for school in adjusted_laqn[:5]:
-        try:
-            sensor = Sensor.objects.get(site_code=school.reference_sensor)
-            reading_count = sensor.readings.count()
-            print(f'\n  {school.name}')
-            print(f'    Reference sensor: {school.reference_sensor} ({sensor.network})')
-            print(f'    Readings available: {reading_count}')
-        except Sensor.DoesNotExist:
-            print(f'\n  {school.name}')
-            print(f'    Reference sensor: {school.reference_sensor} (not found in database)')
+        sensor = school.reference_sensor
+        print(f'\n  {school.name}')
+        print(f'    Reference sensor: {sensor} ({sensor.network})')
+        print(f'    Readings available: {school.reading_count}')
 
 # Schools with no sensor data (LAEI only)
 laei_only = School.objects.filter(data_source='LAEI')
@@ -1,11 +1,7 @@
 #!/usr/bin/env python
 """Check actual sensor relationships in database"""
 
-import os
-import django
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'schools_air_quality_msp4.settings')
-django.setup()
+import _bootstrap  # noqa: F401 - sets up Django
 
 from schools.models import School
 from air_quality.models import Sensor
@@ -13,7 +9,7 @@ from air_quality.models import Sensor
 print('Schools with ForeignKey sensor relationships:\n')
 
 # Check a few schools
-schools = School.objects.filter(data_source='ADJUSTED')[:5]
+schools = School.objects.filter(data_source='ADJUSTED').order_by('name')[:5]
 
 for school in schools:
     print(f'{school.name}:')
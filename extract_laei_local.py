@@ -14,17 +14,36 @@ Usage:
     3. Output: schools_with_laei.json and schools_with_laei.csv
 
 Requirements:
-    - Python 3.7+
+    - Python 3.11+ (the version the rest of the project needs)
     - No external packages required (uses only standard library)
     - Optional: pip install pyproj (for precise coordinate conversion)
+    - Optional: pip install numpy (much faster, lower-memory grid loading)
+    - Optional: pip install orjson (faster JSON reading and writing, via
+      air_quality/jsonutil.py)
 """
 
-import json
 import csv
+import heapq
 import math
 import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from air_quality import jsonutil
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from pyproj import Transformer
+    HAS_PYPROJ = True
+except ImportError:
+    HAS_PYPROJ = False
+
 # ============================================================================
 # CONFIGURATION - UPDATED FOR YOUR SYSTEM
 # ============================================================================
@@ -53,18 +72,23 @@ OUTPUT_SUMMARY = "/Users/GK/Documents/vscode-projects/schools_air_quality_msp4/l
 # COORDINATE CONVERSION
 # ============================================================================
 
+# Built once - creating a Transformer parses the CRS definitions
+_WGS84_TO_BNG = (
+    Transformer.from_crs("EPSG:4326", "EPSG:27700", always_xy=True) if HAS_PYPROJ else None
+)
+
+
 def wgs84_to_bng(latitude, longitude):
     """
     Convert WGS84 (lat/lon) to British National Grid (easting/northing).
     
+    Accepts single values or NumPy arrays of coordinates.
     Uses pyproj if available, otherwise falls back to approximation.
     """
-    try:
-        from pyproj import Transformer
-        transformer = Transformer.from_crs("EPSG:4326", "EPSG:27700", always_xy=True)
-        easting, northing = transformer.transform(longitude, latitude)
+    if HAS_PYPROJ:
+        easting, northing = _WGS84_TO_BNG.transform(longitude, latitude)
         return easting, northing
-    except ImportError:
+    else:
         # Fallback approximation for London (accurate to ~10-15m)
         # Good enough for 20m grid cells
         lon0, lat0 = -0.1, 51.5
@@ -137,6 +161,11 @@ class ASCIIGrid:
             
             # Read data rows
             # Note: Row 0 in file = top (north), so we read top-to-bottom
+            if HAS_NUMPY:
+                self._load_numpy(f)
+                print(f"      Complete: {len(self.data)} rows loaded")
+                return
+            
             row_count = 0
             for line in f:
                 values = line.strip().split()
@@ -149,6 +178,33 @@ class ASCIIGrid:
             
             print(f"      Complete: {len(self.data)} rows loaded")
     
+    def _load_numpy(self, f):
+        """
+        Load the data rows into a NumPy array.
+        
+        The parsed grid is cached as a .npy file next to the .asc, so later
+        runs memory-map it instead of parsing the text again.
+        """
+        cache_path = self.filepath + '.npy'
+        
+        if (os.path.exists(cache_path)
+                and os.path.getmtime(cache_path) >= os.path.getmtime(self.filepath)):
+            data = np.load(cache_path, mmap_mode='r')
+            # Caches from before the grids were parsed as float64 are rebuilt
+            if data.dtype == np.float64:
+                self.data = data
+                print(f"      Using cached grid: {os.path.basename(cache_path)}")
+                return
+        
+        # One float64 array instead of millions of Python floats - the same
+        # precision as float(), so extracted values round exactly as before
+        self.data = np.loadtxt(f, dtype=np.float64, ndmin=2)
+        
+        try:
+            np.save(cache_path, self.data)
+        except OSError as e:
+            print(f"      ⚠️  Could not cache grid: {e}")
+    
     def get_value(self, easting, northing):
         """
         Get the grid value at a specific BNG coordinate.
@@ -173,7 +229,43 @@ class ASCIIGrid:
         if value == self.nodata or value < 0:
             return None
         
-        return value
+        return float(value)
+    
+    def get_values(self, eastings, northings, decimals=None):
+        """
+        Get grid values for many BNG coordinates at once.
+        
+        Returns: list of concentration values, rounded to `decimals` places if
+        given, with None where the point is outside the grid or NODATA (same
+        rules as get_value)
+        """
+        if not HAS_NUMPY:
+            values = [self.get_value(e, n) for e, n in zip(eastings, northings)]
+            if decimals is not None:
+                values = [None if v is None else round(v, decimals) for v in values]
+            return values
+        
+        eastings = np.asarray(eastings, dtype=np.float64)
+        northings = np.asarray(northings, dtype=np.float64)
+        
+        # Same truncation as get_value, done for every point in one go
+        cols = ((eastings - self.xllcorner) / self.cellsize).astype(np.int32)
+        rows = self.nrows - 1 - ((northings - self.yllcorner) / self.cellsize).astype(np.int32)
+        
+        valid = (cols >= 0) & (cols < self.ncols) & (rows >= 0) & (rows < self.nrows)
+        vals = self.data[rows.clip(0, self.nrows - 1), cols.clip(0, self.ncols - 1)]
+        valid &= (vals != self.nodata) & (vals >= 0)
+        
+        values = [float(v) if ok else None for v, ok in zip(vals, valid)]
+        # Python's round(), not np.round(), which can differ on the last digit
+        if decimals is not None:
+            values = [None if v is None else round(v, decimals) for v in values]
+        return values
+
+
+def cache_grid(filepath):
+    """Parse an ASCII grid so its .npy cache is written; returns nothing."""
+    ASCIIGrid(filepath)
 
 
 # ============================================================================
@@ -184,8 +276,9 @@ def load_schools(geojson_path):
     """Load schools from GeoJSON file."""
     print(f"\n📚 Loading schools from: {os.path.basename(geojson_path)}")
     
-    with open(geojson_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Parses the raw bytes directly, skipping the str decode
+    with open(geojson_path, 'rb') as f:
+        data = jsonutil.loads(f.read())
     
     schools = []
     for feature in data['features']:
@@ -222,18 +315,40 @@ def extract_values(schools, grids):
     enriched = []
     found_count = 0
     
+    # Convert coordinates - in one call for all schools when NumPy is available
+    if HAS_NUMPY:
+        eastings, northings = wgs84_to_bng(
+            np.array([s['latitude'] for s in schools], dtype=float),
+            np.array([s['longitude'] for s in schools], dtype=float),
+        )
+    else:
+        coords = [wgs84_to_bng(s['latitude'], s['longitude']) for s in schools]
+        eastings = [c[0] for c in coords]
+        northings = [c[1] for c in coords]
+    
+    # Look up every school in each grid with one batched call per pollutant
+    grid_values = {
+        pollutant: grid.get_values(eastings, northings, decimals=2)
+        for pollutant, grid in grids.items()
+    }
+    
+    # Output coordinates, rounded for all schools at once
+    if HAS_NUMPY:
+        eastings = np.round(eastings, 1).tolist()
+        northings = np.round(northings, 1).tolist()
+    else:
+        eastings = [round(e, 1) for e in eastings]
+        northings = [round(n, 1) for n in northings]
+    
     for i, school in enumerate(schools):
-        # Convert coordinates
-        easting, northing = wgs84_to_bng(school['latitude'], school['longitude'])
-        
         # Extract values from each grid
         concentrations = {}
         has_data = False
         
-        for pollutant, grid in grids.items():
-            value = grid.get_value(easting, northing)
+        for pollutant in grids:
+            value = grid_values[pollutant][i]
             if value is not None:
-                concentrations[f'{pollutant}_2022'] = round(value, 2)
+                concentrations[f'{pollutant}_2022'] = value
                 has_data = True
             else:
                 concentrations[f'{pollutant}_2022'] = None
@@ -241,13 +356,14 @@ def extract_values(schools, grids):
         if has_data:
             found_count += 1
         
-        enriched_school = school.copy()
-        enriched_school['bng_easting'] = round(easting, 1)
-        enriched_school['bng_northing'] = round(northing, 1)
-        enriched_school['laei_found'] = has_data
-        enriched_school['concentrations'] = concentrations
-        
-        enriched.append(enriched_school)
+        # Built in one dict display rather than copied and then updated
+        enriched.append({
+            **school,
+            'bng_easting': eastings[i],
+            'bng_northing': northings[i],
+            'laei_found': has_data,
+            'concentrations': concentrations,
+        })
         
         # Progress indicator
         if (i + 1) % 25 == 0:
@@ -258,14 +374,19 @@ def extract_values(schools, grids):
     return enriched
 
 
+def write_json(data, path):
+    """Write data to a UTF-8 JSON file, indented for readability."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(jsonutil.dumps(data, indent=True))
+
+
 def save_outputs(schools, output_json, output_csv):
     """Save results to JSON and CSV files."""
     
     print(f"\n💾 Saving outputs...")
     
     # JSON output
-    with open(output_json, 'w', encoding='utf-8') as f:
-        json.dump(schools, f, indent=2, ensure_ascii=False)
+    write_json(schools, output_json)
     print(f"   ✓ {os.path.basename(output_json)}")
     
     # CSV output
@@ -279,32 +400,52 @@ def save_outputs(schools, output_json, output_csv):
             'laei_found'
         ] + conc_cols
         
-        with open(output_csv, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
+        def rows():
+            """Each school as a list of values in fieldnames order."""
             for school in schools:
-                row = {
-                    'name': school['name'],
-                    'urn': school['urn'],
-                    'phase': school['phase'],
-                    'borough': school['borough'],
-                    'postcode': school['postcode'],
-                    'latitude': school['latitude'],
-                    'longitude': school['longitude'],
-                    'bng_easting': school.get('bng_easting'),
-                    'bng_northing': school.get('bng_northing'),
-                    'laei_found': school.get('laei_found', False)
-                }
-                
-                for col in conc_cols:
-                    row[col] = school.get('concentrations', {}).get(col, '')
-                
-                writer.writerow(row)
+                concentrations = school.get('concentrations', {})
+                yield [
+                    school['name'],
+                    school['urn'],
+                    school['phase'],
+                    school['borough'],
+                    school['postcode'],
+                    school['latitude'],
+                    school['longitude'],
+                    school.get('bng_easting'),
+                    school.get('bng_northing'),
+                    school.get('laei_found', False),
+                ] + [concentrations.get(col, '') for col in conc_cols]
+        
+        # Plain lists through csv.writer skip DictWriter's per-row dict
+        # handling, and writerows() takes every row in one call
+        with open(output_csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            writer.writerows(rows())
         
         print(f"   ✓ {os.path.basename(output_csv)}")
 
 
+def count_above(values, thresholds=(40, 20, 10)):
+    """
+    Count how many values exceed each threshold.
+    
+    Defaults are the NO2 UK limit, EU 2024 target and WHO 2021 guideline.
+    """
+    if HAS_NUMPY:
+        arr = np.asarray(values, dtype=np.float64)
+        return tuple(int((arr > t).sum()) for t in thresholds)
+    
+    # Single pass over the values rather than one per threshold
+    counts = [0] * len(thresholds)
+    for v in values:
+        for j, t in enumerate(thresholds):
+            if v > t:
+                counts[j] += 1
+    return tuple(counts)
+
+
 def print_summary(schools):
     """Print a summary of the extracted data and return summary dict."""
     
@@ -333,17 +474,26 @@ def print_summary(schools):
     # Get concentration columns
     conc_keys = list(found[0].get('concentrations', {}).keys())
     
+    # Every pollutant's non-missing values, gathered in one pass over the schools
+    values_by_key = {key: [] for key in conc_keys}
+    for school in found:
+        for key, value in school['concentrations'].items():
+            if value is not None and key in values_by_key:
+                values_by_key[key].append(value)
+    
     print(f"\n📈 Pollutant Values (µg/m³):")
     
     for key in sorted(conc_keys):
-        values = [s['concentrations'].get(key) 
-                  for s in found 
-                  if s['concentrations'].get(key) is not None]
+        values = values_by_key[key]
         
         if values:
-            min_val = min(values)
-            max_val = max(values)
-            mean_val = sum(values) / len(values)
+            if HAS_NUMPY:
+                arr = np.array(values, dtype=np.float64)
+                min_val, max_val, mean_val = float(arr.min()), float(arr.max()), float(arr.mean())
+            else:
+                min_val = min(values)
+                max_val = max(values)
+                mean_val = sum(values) / len(values)
             
             print(f"\n   {key}:")
             print(f"      Min:  {min_val:.1f}")
@@ -360,13 +510,9 @@ def print_summary(schools):
     # Health guideline comparison (for NO2)
     no2_key = next((k for k in conc_keys if 'NO2' in k.upper()), None)
     if no2_key:
-        values = [s['concentrations'].get(no2_key) 
-                  for s in found 
-                  if s['concentrations'].get(no2_key) is not None]
+        values = values_by_key[no2_key]
         
-        above_40 = sum(1 for v in values if v > 40)
-        above_20 = sum(1 for v in values if v > 20)
-        above_10 = sum(1 for v in values if v > 10)
+        above_40, above_20, above_10 = count_above(values)
         
         print(f"\n📋 NO₂ vs Regulatory Standards ({len(values)} schools):")
         print(f"   Above UK limit (40 µg/m³):           {above_40} ({above_40/len(values)*100:.1f}%)")
@@ -391,20 +537,16 @@ def print_summary(schools):
         summary['borough_comparison'] = {}
         
         # Group schools by borough
-        boroughs = {}
+        boroughs = defaultdict(list)
         for school in found:
             no2_val = school['concentrations'].get(no2_key)
             if no2_val is not None:
-                borough = school.get('borough', 'Unknown')
-                if borough not in boroughs:
-                    boroughs[borough] = []
-                boroughs[borough].append(no2_val)
+                boroughs[school.get('borough', 'Unknown')].append(no2_val)
         
-        for borough in sorted(boroughs.keys()):
+        for borough in sorted(boroughs):
             values = boroughs[borough]
-            above_40 = sum(1 for v in values if v > 40)
-            above_20 = sum(1 for v in values if v > 20)
-            above_10 = sum(1 for v in values if v > 10)
+            above_40, above_20, above_10 = count_above(values)
+            min_val, max_val = min(values), max(values)
             mean_val = sum(values) / len(values)
             
             print(f"\n   {borough} ({len(values)} schools):")
@@ -416,8 +558,8 @@ def print_summary(schools):
             summary['borough_comparison'][borough] = {
                 'total_schools': len(values),
                 'mean_no2': round(mean_val, 2),
-                'min_no2': round(min(values), 2),
-                'max_no2': round(max(values), 2),
+                'min_no2': round(min_val, 2),
+                'max_no2': round(max_val, 2),
                 'above_uk_limit_40': above_40,
                 'above_eu_2024_target_20': above_20,
                 'above_who_2021_guideline_10': above_10,
@@ -433,17 +575,18 @@ def print_summary(schools):
         schools_with_value = [s for s in found if s['concentrations'].get(key) is not None]
         
         if schools_with_value:
-            sorted_schools = sorted(
+            # Partial selection - same order as a full descending sort's first 5
+            top_schools = heapq.nlargest(
+                5,
                 schools_with_value,
-                key=lambda x: x['concentrations'][key],
-                reverse=True
+                key=lambda x: x['concentrations'][key]
             )
             
             pollutant_name = key.replace('_2022', '').replace('_', ' ').upper()
             print(f"\n   {pollutant_name}:")
             
             top_5 = []
-            for i, school in enumerate(sorted_schools[:5], 1):
+            for i, school in enumerate(top_schools, 1):
                 val = school['concentrations'][key]
                 print(f"      {i}. {school['name'][:42]}: {val:.1f} µg/m³")
                 
@@ -484,19 +627,28 @@ def main():
     # Load each ASCII grid
     print(f"\n🗺️  Loading LAEI ASCII grids from: {os.path.basename(LAEI_FOLDER)}")
     
-    grids = {}
+    paths = {}
     for pollutant, filename in ASC_FILES.items():
         filepath = os.path.join(LAEI_FOLDER, filename)
         
         if os.path.exists(filepath):
-            grids[pollutant] = ASCIIGrid(filepath)
+            paths[pollutant] = filepath
         else:
             print(f"   ⚠️  File not found: {filename}")
     
-    if not grids:
+    if not paths:
         print("\n❌ No LAEI grid files found. Check the filenames in ASC_FILES.")
         return
     
+    # Parsing is CPU-bound, so build each grid's .npy cache in its own
+    # process; the grids are then memory-mapped here rather than pickled back
+    if HAS_NUMPY:
+        workers = min(len(paths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(cache_grid, paths.values()))
+    
+    grids = {pollutant: ASCIIGrid(filepath) for pollutant, filepath in paths.items()}
+    
     print(f"\n   Loaded {len(grids)} pollutant grids: {', '.join(grids.keys())}")
     
     # Extract values for each school
@@ -510,8 +662,7 @@ def main():
     
     # Save summary statistics
     print(f"\n💾 Saving summary statistics...")
-    with open(OUTPUT_SUMMARY, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    write_json(summary, OUTPUT_SUMMARY)
     print(f"   ✓ {os.path.basename(OUTPUT_SUMMARY)}")
     
     print(f"\n✅ Complete!")
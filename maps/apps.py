@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class MapsConfig(AppConfig):
     name = 'maps'
+    
+    def ready(self):
+        # Connect the map cache invalidation receivers
+        from . import signals  # noqa: F401
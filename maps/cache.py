@@ -0,0 +1,14 @@
+from django.core.cache import cache
+
+# Cache key for the serialised map data
+MAP_CACHE_KEY = 'maps:map_context'
+
+
+def clear_map_cache():
+    """
+    Drop the cached map data so the next request rebuilds it.
+    
+    Saving a School or Sensor does this through signals; code writing with
+    bulk_create/bulk_update (which send none) has to call it itself.
+    """
+    cache.delete(MAP_CACHE_KEY)
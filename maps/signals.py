@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from schools.models import School
+from air_quality.models import Reading, Sensor
+from .cache import clear_map_cache
+
+
+@receiver([post_save, post_delete], sender=School)
+@receiver([post_save, post_delete], sender=Sensor)
+@receiver([post_save, post_delete], sender=Reading)
+def map_data_changed(sender, **kwargs):
+    """Drop the cached map data so the next request rebuilds it"""
+    clear_map_cache()
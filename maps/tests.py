@@ -1,7 +1,13 @@
 from django.test import TestCase, Client
+from django.core.cache import cache
+from django.core.management import call_command
 from django.urls import reverse
 from decimal import Decimal
+from io import StringIO
+import json
+from django.utils import timezone
 from schools.models import School
+from air_quality.models import Sensor, SensorAnnualStats
 
 # Create your tests here.
 class MapViewTest(TestCase):
@@ -9,6 +15,7 @@ class MapViewTest(TestCase):
     
     def setUp(self):
         """Create test schools and client"""
+        cache.clear()
         self.client = Client()
         self.school1 = School.objects.create(
             name="School One",
@@ -42,4 +49,55 @@ class MapViewTest(TestCase):
     def test_map_view_context(self):
         """Test that schools data is passed to template"""
         response = self.client.get(reverse('maps:map'))
-        self.assertIn('schools_json', response.context)
\ No newline at end of file
+        self.assertIn('schools_json', response.context)
+    
+    def test_map_schools_ordered_by_name(self):
+        """Test schools reach the map's search list in name order"""
+        School.objects.create(
+            name="Alpha School", address="3 Test Rd", city="London",
+            postcode="SE3 3CC", latitude=Decimal("51.5"), longitude=Decimal("-0.1")
+        )
+        response = self.client.get(reverse('maps:map'))
+        names = [s['name'] for s in json.loads(response.context['schools_json'])]
+        self.assertEqual(names, ["Alpha School", "School One", "School Two"])
+    
+    def test_map_view_query_count(self):
+        """Test that the map view query count doesn't grow with the number of schools"""
+        for i, school in enumerate([self.school1, self.school2]):
+            sensor = Sensor.objects.create(
+                site_code=f"LB{i}", name=f"Sensor {i}",
+                latitude=51.5, longitude=-0.1, network='LAQN',
+                last_reading_at=timezone.now(), last_no2=30.0
+            )
+            SensorAnnualStats.objects.create(sensor=sensor, year=2024, no2_mean=25.0)
+            school.no2_2022 = 35.0
+            school.reference_sensor = sensor
+            if i == 0:
+                school.direct_sensor = sensor
+            school.save()
+        # Schools, prefetched annual stats and the sensor list
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('maps:map'))
+        self.assertEqual(response.status_code, 200)
+    
+    def test_map_view_cached(self):
+        """Test repeat requests reuse the cached map data until a school changes"""
+        self.client.get(reverse('maps:map'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('maps:map'))
+        self.school1.name = "Renamed School"
+        self.school1.save()
+        response = self.client.get(reverse('maps:map'))
+        self.assertIn('Renamed School', response.context['schools_json'])
+    
+    def test_map_cache_cleared_by_bulk_commands(self):
+        """Test commands writing schools in bulk still invalidate the cached map data"""
+        Sensor.objects.create(
+            site_code="LB4", name="Brixton Road",
+            latitude=51.5075, longitude=-0.1279, network='LAQN',
+            site_type='urban_background'
+        )
+        self.client.get(reverse('maps:map'))
+        call_command('assign_sensors', stdout=StringIO())
+        response = self.client.get(reverse('maps:map'))
+        self.assertIn('"direct_sensor":"LB4"', response.context['schools_json'])
@@ -1,12 +1,29 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import render
 from schools.models import School
+from air_quality import jsonutil
 from air_quality.models import Sensor
-import json
+from .cache import MAP_CACHE_KEY
+
 
 def map_view(request):
     """Display all schools and sensors on a map"""
-    schools = School.objects.all()
-    sensors = Sensor.objects.filter(is_active=True)
+    # Readings only change hourly, so the JSON is rebuilt at most every
+    # MAP_CACHE_TIMEOUT seconds rather than on every request
+    context = cache.get_or_set(MAP_CACHE_KEY, build_map_context, settings.MAP_CACHE_TIMEOUT)
+    
+    return render(request, 'maps/map.html', context)
+
+
+def build_map_context() -> dict:
+    """Serialise all schools and active sensors for the map's JavaScript"""
+    # By name, so the search box lists its matches alphabetically
+    schools = School.with_air_quality().order_by('name')
+    # Plain dicts of just the columns the map shows - no model instances
+    sensors = Sensor.objects.filter(is_active=True).values(
+        'site_code', 'network', 'site_type', 'latitude', 'longitude'
+    )
     
     # Prepare school data for JavaScript
     schools_data = []
@@ -40,11 +57,11 @@ def map_view(request):
             'latitude': float(school.latitude),
             'longitude': float(school.longitude),
             # LAEI 2022 pollution data
-            'no2_2022': float(school.no2_2022) if school.no2_2022 else None,
-            'nox_2022': float(school.nox_2022) if school.nox_2022 else None,
-            'pm25_2022': float(school.pm25_2022) if school.pm25_2022 else None,
-            'pm10_mean_2022': float(school.pm10_mean_2022) if school.pm10_mean_2022 else None,
-            'pm10_days_2022': float(school.pm10_days_2022) if school.pm10_days_2022 else None,
+            'no2_2022': school.no2_2022 or None,
+            'nox_2022': school.nox_2022 or None,
+            'pm25_2022': school.pm25_2022 or None,
+            'pm10_mean_2022': school.pm10_mean_2022 or None,
+            'pm10_days_2022': school.pm10_days_2022 or None,
             'laei_data_available': school.laei_data_available,
             # Dynamic data source based on current sensor availability
             'data_source': data_source,
@@ -58,21 +75,20 @@ def map_view(request):
     sensors_data = []
     for sensor in sensors:
         sensors_data.append({
-            'site_code': sensor.site_code,
-            'name': sensor.site_code,
-            'network': sensor.network,
-            'site_type': sensor.site_type,
-            'latitude': float(sensor.latitude),
-            'longitude': float(sensor.longitude),
-            'is_reference_grade': sensor.is_reference_grade,
-            'is_urban_background': sensor.is_urban_background,
+            'site_code': sensor['site_code'],
+            'name': sensor['site_code'],
+            'network': sensor['network'],
+            'site_type': sensor['site_type'],
+            'latitude': float(sensor['latitude']),
+            'longitude': float(sensor['longitude']),
+            # Same rules as Sensor.is_reference_grade / is_urban_background
+            'is_reference_grade': sensor['network'] == 'LAQN',
+            'is_urban_background': sensor['site_type'] == 'urban_background',
         })
     
-    context = {
-        'schools_json': json.dumps(schools_data),
-        'sensors_json': json.dumps(sensors_data),
+    return {
+        'schools_json': jsonutil.dumps(schools_data),
+        'sensors_json': jsonutil.dumps(sensors_data),
     }
-    
-    return render(request, 'maps/map.html', context)
 
 # Create your views here.
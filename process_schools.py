@@ -18,13 +18,16 @@ Usage:
 
 Requirements:
     pip install pandas pyproj
+    Optional: pip install orjson (faster GeoJSON output, via air_quality/jsonutil.py)
 """
 
 import pandas as pd
 import argparse
-import json
+import codecs
 from pathlib import Path
 
+from air_quality import jsonutil
+
 # Optional: for coordinate conversion from British National Grid to WGS84
 try:
     from pyproj import Transformer
@@ -33,31 +36,89 @@ except ImportError:
     HAS_PYPROJ = False
     print("Note: Install pyproj for coordinate conversion: pip install pyproj")
 
+# Built once - creating a Transformer parses the CRS definitions
+_BNG_TO_WGS84 = (
+    Transformer.from_crs("EPSG:27700", "EPSG:4326", always_xy=True) if HAS_PYPROJ else None
+)
+
 
 def convert_bng_to_wgs84(easting, northing):
-    """Convert British National Grid to WGS84 lat/lon."""
+    """
+    Convert British National Grid to WGS84 lat/lon.
+    
+    Accepts single values or arrays of coordinates.
+    """
     if not HAS_PYPROJ:
         return None, None
     
-    transformer = Transformer.from_crs("EPSG:27700", "EPSG:4326", always_xy=True)
-    lon, lat = transformer.transform(easting, northing)
+    lon, lat = _BNG_TO_WGS84.transform(easting, northing)
     return lat, lon
 
 
-def load_gias_data(filepath):
-    """Load GIAS CSV data with proper encoding."""
-    # GIAS files often have Windows-1252 or Latin-1 encoding
-    encodings = ['utf-8', 'latin-1', 'cp1252']
-    
+# GIAS column names used by filter_schools and process_for_output, across the
+# naming variants of different exports - everything else is skipped on load
+LA_COLUMNS = ['LA (name)', 'LA Name', 'LocalAuthority']
+PHASE_COLUMNS = ['PhaseOfEducation (name)', 'Phase', 'PhaseOfEducation']
+STATUS_COLUMNS = ['EstablishmentStatus (name)', 'Status', 'EstablishmentStatus']
+COLUMN_MAPPING = {
+    'URN': 'urn',
+    'EstablishmentName': 'name',
+    'Establishment Name': 'name',
+    'EstablishmentTypeGroup (name)': 'type',
+    'TypeOfEstablishment (name)': 'type',
+    'PhaseOfEducation (name)': 'phase',
+    'Phase': 'phase',
+    'Street': 'street',
+    'Locality': 'locality',
+    'Town': 'town',
+    'Postcode': 'postcode',
+    'Easting': 'easting',
+    'Northing': 'northing',
+    'LA (name)': 'local_authority',
+    'LA Name': 'local_authority',
+}
+GIAS_COLUMNS = set(LA_COLUMNS) | set(PHASE_COLUMNS) | set(STATUS_COLUMNS) | set(COLUMN_MAPPING)
+
+
+def detect_encoding(filepath, encodings, chunk_size=1 << 20):
+    """Return the first encoding that decodes the whole file, or None."""
     for encoding in encodings:
+        decoder = codecs.getincrementaldecoder(encoding)()
         try:
-            df = pd.read_csv(filepath, encoding=encoding, low_memory=False)
-            print(f"Loaded {len(df)} records using {encoding} encoding")
-            return df
+            with open(filepath, 'rb') as f:
+                # Decode in chunks so a large file isn't held in memory
+                while chunk := f.read(chunk_size):
+                    decoder.decode(chunk)
+                decoder.decode(b'', final=True)
         except UnicodeDecodeError:
             continue
+        return encoding
+    return None
+
+
+def load_gias_data(filepath):
+    """Load GIAS CSV data with proper encoding."""
+    # GIAS files often have Windows-1252 or Latin-1 encoding
+    encodings = ['utf-8', 'latin-1', 'cp1252']
     
-    raise ValueError(f"Could not read file with any of these encodings: {encodings}")
+    # Find the encoding with a plain decode, so the CSV is only parsed once
+    encoding = detect_encoding(filepath, encodings)
+    if encoding is None:
+        raise ValueError(f"Could not read file with any of these encodings: {encodings}")
+    
+    # Only the header row, so a missing column can still be reported against
+    # the full export after the unused columns are dropped below
+    header = pd.read_csv(filepath, encoding=encoding, nrows=0).columns.tolist()
+    
+    df = pd.read_csv(
+        filepath,
+        encoding=encoding,
+        low_memory=False,
+        usecols=[col for col in header if col in GIAS_COLUMNS],
+    )
+    df.attrs['gias_columns'] = header
+    print(f"Loaded {len(df)} records using {encoding} encoding")
+    return df
 
 
 def filter_schools(df, boroughs=None, phases=None, status='Open'):
@@ -69,28 +130,17 @@ def filter_schools(df, boroughs=None, phases=None, status='Open'):
     if phases is None:
         phases = ['Nursery', 'Primary', 'All-through']
     
-    # Column names may vary slightly in GIAS exports
-    la_column = None
-    for col in ['LA (name)', 'LA Name', 'LocalAuthority']:
-        if col in df.columns:
-            la_column = col
-            break
+    # Column names may vary slightly in GIAS exports - use the first present
+    columns = set(df.columns)
+    la_column = next((col for col in LA_COLUMNS if col in columns), None)
     
     if la_column is None:
-        print("Available columns:", df.columns.tolist())
+        print("Available columns:", df.attrs.get('gias_columns', df.columns.tolist()))
         raise ValueError("Could not find Local Authority column")
     
-    phase_column = None
-    for col in ['PhaseOfEducation (name)', 'Phase', 'PhaseOfEducation']:
-        if col in df.columns:
-            phase_column = col
-            break
+    phase_column = next((col for col in PHASE_COLUMNS if col in columns), None)
     
-    status_column = None
-    for col in ['EstablishmentStatus (name)', 'Status', 'EstablishmentStatus']:
-        if col in df.columns:
-            status_column = col
-            break
+    status_column = next((col for col in STATUS_COLUMNS if col in columns), None)
     
     # Apply filters
     df_filtered = df.copy()
@@ -116,29 +166,13 @@ def process_for_output(df):
     """Process dataframe and add lat/lon coordinates."""
     
     # Map column names (handle variations in GIAS exports)
-    column_mapping = {
-        'URN': 'urn',
-        'EstablishmentName': 'name',
-        'Establishment Name': 'name',
-        'EstablishmentTypeGroup (name)': 'type',
-        'TypeOfEstablishment (name)': 'type',
-        'PhaseOfEducation (name)': 'phase',
-        'Phase': 'phase',
-        'Street': 'street',
-        'Locality': 'locality',
-        'Town': 'town',
-        'Postcode': 'postcode',
-        'Easting': 'easting',
-        'Northing': 'northing',
-        'LA (name)': 'local_authority',
-        'LA Name': 'local_authority',
-    }
-    
     # Find which columns exist and rename
-    rename_map = {}
-    for old_name, new_name in column_mapping.items():
-        if old_name in df.columns:
-            rename_map[old_name] = new_name
+    columns = set(df.columns)
+    rename_map = {
+        old_name: new_name
+        for old_name, new_name in COLUMN_MAPPING.items()
+        if old_name in columns
+    }
     
     df_processed = df.rename(columns=rename_map)
     
@@ -146,32 +180,28 @@ def process_for_output(df):
     desired_columns = ['urn', 'name', 'type', 'phase', 'street', 'locality', 
                        'town', 'postcode', 'easting', 'northing', 'local_authority']
     
-    available_columns = [col for col in desired_columns if col in df_processed.columns]
+    processed_columns = set(df_processed.columns)
+    available_columns = [col for col in desired_columns if col in processed_columns]
     df_processed = df_processed[available_columns].copy()
     
     # Convert coordinates if easting/northing are present
     if 'easting' in df_processed.columns and 'northing' in df_processed.columns:
         if HAS_PYPROJ:
             print("Converting coordinates from British National Grid to WGS84...")
-            lats = []
-            lons = []
-            for _, row in df_processed.iterrows():
-                try:
-                    e = float(row['easting']) if pd.notna(row['easting']) else None
-                    n = float(row['northing']) if pd.notna(row['northing']) else None
-                    if e and n:
-                        lat, lon = convert_bng_to_wgs84(e, n)
-                        lats.append(round(lat, 6))
-                        lons.append(round(lon, 6))
-                    else:
-                        lats.append(None)
-                        lons.append(None)
-                except:
-                    lats.append(None)
-                    lons.append(None)
+            # Unparseable values become NaN; missing or zero coordinates
+            # are left without a lat/lon
+            eastings = pd.to_numeric(df_processed['easting'], errors='coerce')
+            northings = pd.to_numeric(df_processed['northing'], errors='coerce')
+            has_coords = eastings.notna() & northings.notna() & (eastings != 0) & (northings != 0)
             
-            df_processed['latitude'] = lats
-            df_processed['longitude'] = lons
+            # All rows converted in a single transform call
+            lats, lons = convert_bng_to_wgs84(
+                eastings[has_coords].to_numpy(dtype=float),
+                northings[has_coords].to_numpy(dtype=float),
+            )
+            
+            df_processed['latitude'] = pd.Series(lats, index=eastings.index[has_coords]).round(6)
+            df_processed['longitude'] = pd.Series(lons, index=eastings.index[has_coords]).round(6)
     
     return df_processed
 
@@ -180,25 +210,37 @@ def export_to_geojson(df, output_path):
     """Export schools to GeoJSON format for Leaflet mapping."""
     features = []
     
-    lat_col = 'latitude' if 'latitude' in df.columns else None
-    lon_col = 'longitude' if 'longitude' in df.columns else None
-    
-    for _, row in df.iterrows():
-        if lat_col and lon_col and pd.notna(row[lat_col]) and pd.notna(row[lon_col]):
+    if 'latitude' in df.columns and 'longitude' in df.columns:
+        located = df.dropna(subset=['latitude', 'longitude'])
+        
+        def column(name, default=''):
+            """Column values, or the default for every row if it's missing."""
+            if name in located.columns:
+                return located[name].tolist()
+            return [default] * len(located)
+        
+        # Zip plain column lists rather than building a Series per row
+        rows = zip(
+            located['latitude'].tolist(), located['longitude'].tolist(),
+            column('name'), column('urn', None), column('type'),
+            column('phase'), column('postcode'), column('local_authority'),
+        )
+        
+        for lat, lon, name, urn, school_type, phase, postcode, local_authority in rows:
             feature = {
                 "type": "Feature",
                 "geometry": {
                     "type": "Point",
-                    "coordinates": [float(row[lon_col]), float(row[lat_col])]
+                    "coordinates": [float(lon), float(lat)]
                 
                 },
                  "properties": {
-                    "name": str(row.get('name', '')),
-                    "urn": int(row['urn']) if pd.notna(row.get('urn')) else None,
-                    "type": str(row.get('type', '')),
-                    "phase": str(row.get('phase', '')),
-                    "postcode": str(row.get('postcode', '')),
-                    "local_authority": str(row.get('local_authority', ''))
+                    "name": str(name),
+                    "urn": int(urn) if pd.notna(urn) else None,
+                    "type": str(school_type),
+                    "phase": str(phase),
+                    "postcode": str(postcode),
+                    "local_authority": str(local_authority)
                 }
             }
             features.append(feature)
@@ -208,8 +250,8 @@ def export_to_geojson(df, output_path):
         "features": features
     }
     
-    with open(output_path, 'w') as f:
-        json.dump(geojson, f, indent=2)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(jsonutil.dumps(geojson, indent=True))
     
     print(f"Exported {len(features)} schools to GeoJSON: {output_path}")
 
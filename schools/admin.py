@@ -1,6 +1,17 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from .models import School
 
+
+class SchoolChangeList(ChangeList):
+    """Change list that only loads the columns it displays."""
+    
+    def get_queryset(self, request, exclude_parameters=None):
+        # Done here rather than in SchoolAdmin.get_queryset, which the
+        # change form also uses to load the full school
+        return super().get_queryset(request, exclude_parameters).only(*self.model_admin.list_display)
+
+
 # Register your models here.
 @admin.register(School)
 class SchoolAdmin(admin.ModelAdmin):
@@ -23,4 +34,6 @@ class SchoolAdmin(admin.ModelAdmin):
             'fields': ('laei_data_available', 'no2_2022', 'nox_2022', 'pm25_2022', 'pm10_mean_2022', 'pm10_days_2022')
         }),
     )
-
+    
+    def get_changelist(self, request, **kwargs):
+        return SchoolChangeList
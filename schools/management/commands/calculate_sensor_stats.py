@@ -8,7 +8,13 @@ Usage:
 
 from django.core.management.base import BaseCommand
 from django.db.models import Avg, Count
-from schools.models import Sensor, Reading, SensorAnnualStats
+from django.db.models.functions import ExtractYear
+from air_quality.models import Sensor, Reading, SensorAnnualStats
+from maps.cache import clear_map_cache
+
+
+# Annual stats columns written by the command
+STATS_FIELDS = ['no2_mean', 'pm25_mean', 'pm10_mean', 'o3_mean', 'capture_rate']
 
 
 class Command(BaseCommand):
@@ -24,36 +30,58 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         target_year = options.get('year')
         
-        sensors = Sensor.objects.filter(is_active=True)
+        sensors = Sensor.objects.filter(is_active=True).only('id', 'site_code')
+        
+        # Reading count and means for every (sensor, year) in one GROUP BY
+        # query, rather than a count and an aggregate per sensor-year
+        readings = Reading.objects.filter(sensor__is_active=True)
+        if target_year:
+            readings = readings.filter(timestamp__year=target_year)
+        yearly = readings.annotate(
+            year=ExtractYear('timestamp')
+        ).values('sensor_id', 'year').annotate(
+            count=Count('id'),
+            no2_mean=Avg('no2'),
+            pm25_mean=Avg('pm25'),
+            pm10_mean=Avg('pm10'),
+            o3_mean=Avg('o3'),
+        ).order_by()
+        
+        aggregates_by_sensor = {}
+        for row in yearly:
+            aggregates_by_sensor.setdefault(row['sensor_id'], {})[row['year']] = row
+        
+        # Existing (sensor, year) pairs in one query
+        existing = set(
+            SensorAnnualStats.objects.filter(
+                sensor__is_active=True
+            ).values_list('sensor_id', 'year')
+        )
+        
+        stats_to_save = []
         
         for sensor in sensors:
+            aggregates_by_year = aggregates_by_sensor.get(sensor.id, {})
+            
             # Determine which years to process
             if target_year:
                 years = [target_year]
             else:
-                # Get all years with readings
-                years = Reading.objects.filter(
-                    sensor=sensor
-                ).dates('timestamp', 'year')
-                years = [d.year for d in years]
+                years = sorted(aggregates_by_year)
             
             for year in years:
                 self.stdout.write(f'Calculating {sensor.site_code} - {year}...')
                 
-                # Get readings for this year
-                readings = Reading.objects.filter(
-                    sensor=sensor,
-                    timestamp__year=year
-                )
+                aggregates = aggregates_by_year.get(year)
                 
-                count = readings.count()
-                
-                if count == 0:
+                if aggregates is None:
                     self.stdout.write(
                         self.style.WARNING(f'  No data for {year}')
                     )
                     continue
                 
+                count = aggregates['count']
+                
                 # Calculate capture rate
                 total_hours = 365 * 24
                 if year % 4 == 0:  # Leap year
@@ -71,28 +99,17 @@ class Command(BaseCommand):
                     )
                     continue
                 
-                # Calculate means
-                aggregates = readings.aggregate(
-                    no2_mean=Avg('no2'),
-                    pm25_mean=Avg('pm25'),
-                    pm10_mean=Avg('pm10'),
-                    o3_mean=Avg('o3'),
-                )
-                
-                # Create or update stats
-                stats, created = SensorAnnualStats.objects.update_or_create(
+                stats_to_save.append(SensorAnnualStats(
                     sensor=sensor,
                     year=year,
-                    defaults={
-                        'no2_mean': aggregates['no2_mean'],
-                        'pm25_mean': aggregates['pm25_mean'],
-                        'pm10_mean': aggregates['pm10_mean'],
-                        'o3_mean': aggregates['o3_mean'],
-                        'capture_rate': round(capture_rate, 2),
-                    }
-                )
+                    no2_mean=aggregates['no2_mean'],
+                    pm25_mean=aggregates['pm25_mean'],
+                    pm10_mean=aggregates['pm10_mean'],
+                    o3_mean=aggregates['o3_mean'],
+                    capture_rate=round(capture_rate, 2),
+                ))
                 
-                action = 'Created' if created else 'Updated'
+                action = 'Updated' if (sensor.id, year) in existing else 'Created'
                 self.stdout.write(
                     self.style.SUCCESS(
                         f'  ✓ {action}: {count} readings, '
@@ -100,4 +117,15 @@ class Command(BaseCommand):
                     )
                 )
         
-        self.stdout.write(self.style.SUCCESS('\nDone!'))
\ No newline at end of file
+        # Create or update
+        if stats_to_save:
+            SensorAnnualStats.objects.bulk_create(
+                stats_to_save,
+                update_conflicts=True,
+                unique_fields=['sensor', 'year'],
+                update_fields=STATS_FIELDS,
+                batch_size=1000,
+            )
+            clear_map_cache()
+        
+        self.stdout.write(self.style.SUCCESS('\nDone!'))
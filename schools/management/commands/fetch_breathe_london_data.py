@@ -7,12 +7,16 @@ Usage:
 """
 
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from decimal import Decimal
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.conf import settings
 from django.utils import timezone
-from schools.models import Sensor, Reading
+from requests.adapters import HTTPAdapter
+from air_quality import jsonutil
+from air_quality.models import Sensor, Reading
+from maps.cache import clear_map_cache
 
 
 class Command(BaseCommand):
@@ -28,6 +32,12 @@ class Command(BaseCommand):
             default=24,
             help='Number of hours to fetch (default: 24)'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=16,
+            help='Concurrent API requests (default: 16)'
+        )
     
     def handle(self, *args, **options):
         # Check API key
@@ -40,10 +50,10 @@ class Command(BaseCommand):
         
         hours = options['hours']
         
-        # Get active Breathe London sensors
-        sensors = Sensor.objects.filter(network='BREATHE', is_active=True)
+        # Get active Breathe London sensors, evaluated once
+        sensors = list(Sensor.objects.filter(network='BREATHE', is_active=True))
         
-        if not sensors.exists():
+        if not sensors:
             self.stdout.write(self.style.WARNING('No active Breathe London sensors found'))
             return
         
@@ -56,30 +66,55 @@ class Command(BaseCommand):
             'X-API-Key': api_key
         }
         
-        total_created = 0
+        # Parsed entries per sensor
+        entries_by_sensor = {}
         
-        for sensor in sensors:
-            self.stdout.write(f'Processing {sensor.site_code} - {sensor.name}...')
+        # Sensors are requested concurrently over one keep-alive connection
+        # pool; readings are saved on the main thread once they are all in
+        workers = options['workers']
+        with requests.Session() as session:
+            session.mount('https://', HTTPAdapter(pool_connections=workers, pool_maxsize=workers))
             
-            # Fetch readings
-            created = self._fetch_sensor_readings(
-                sensor,
-                start_date,
-                end_date,
-                headers
-            )
-            total_created += created
-            
-            self.stdout.write(
-                self.style.SUCCESS(f'  ✓ {created} readings imported')
-            )
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        self._fetch_sensor_readings,
+                        session,
+                        sensor,
+                        start_date,
+                        end_date,
+                        headers
+                    ): sensor
+                    for sensor in sensors
+                }
+                
+                for future in as_completed(futures):
+                    entries_by_sensor[futures[future].id] = future.result()
+        
+        total_created = 0
+        
+        # All sensors' writes are committed together rather than one
+        # commit per sensor
+        with transaction.atomic():
+            for sensor in sensors:
+                self.stdout.write(f'Processing {sensor.site_code} - {sensor.name}...')
+                
+                created = self._save_readings(sensor, entries_by_sensor[sensor.id])
+                total_created += created
+                
+                self.stdout.write(
+                    self.style.SUCCESS(f'  ✓ {created} readings imported')
+                )
+        
+        if total_created:
+            clear_map_cache()
         
         self.stdout.write(
             self.style.SUCCESS(f'\nTotal: {total_created} readings imported')
         )
     
-    def _fetch_sensor_readings(self, sensor, start_date, end_date, headers):
-        """Fetch readings for one sensor."""
+    def _fetch_sensor_readings(self, session, sensor, start_date, end_date, headers):
+        """Fetch readings for one sensor, keyed by timestamp."""
         
         # API endpoint structure (adjust based on actual Breathe London API docs)
         url = f'{self.BASE_URL}/getCalibratedSensorReadings'
@@ -92,63 +127,79 @@ class Command(BaseCommand):
         }
         
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=30)
+            response = session.get(url, params=params, headers=headers, timeout=30)
             response.raise_for_status()
             
-            data = response.json()
-            
-            readings_to_create = []
-            
-            # Parse response (structure depends on actual API)
-            if 'readings' in data:
-                for entry in data['readings']:
-                    timestamp_str = entry.get('timestamp')
-                    
-                    if not timestamp_str:
-                        continue
-                    
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp_str)
-                        if timezone.is_naive(timestamp):
-                            timestamp = timezone.make_aware(timestamp)
-                        
-                        # Check if exists
-                        if Reading.objects.filter(
-                            sensor=sensor,
-                            timestamp=timestamp
-                        ).exists():
-                            continue
-                        
-                        reading = Reading(
-                            sensor=sensor,
-                            timestamp=timestamp,
-                            no2=self._parse_value(entry.get('no2')),
-                            pm25=self._parse_value(entry.get('pm2_5')),
-                            pm10=self._parse_value(entry.get('pm10')),
-                        )
-                        readings_to_create.append(reading)
-                    
-                    except (ValueError, TypeError) as e:
-                        continue
-            
-            # Bulk create
-            if readings_to_create:
-                Reading.objects.bulk_create(readings_to_create, ignore_conflicts=True)
-            
-            return len(readings_to_create)
+            data = jsonutil.loads(response.content)
         
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             self.stdout.write(
-                self.style.WARNING(f'  Error fetching data: {e}')
+                self.style.WARNING(f'  Error fetching data for {sensor.site_code}: {e}')
             )
-            return 0
+            return {}
+        
+        parsed = {}
+        
+        # Parse response (structure depends on actual API)
+        if 'readings' in data:
+            for entry in data['readings']:
+                timestamp_str = entry.get('timestamp')
+                
+                if not timestamp_str:
+                    continue
+                
+                try:
+                    timestamp = datetime.fromisoformat(timestamp_str)
+                    if timezone.is_naive(timestamp):
+                        timestamp = timezone.make_aware(timestamp)
+                    
+                    # First entry wins, as ignore_conflicts would have it
+                    parsed.setdefault(timestamp, entry)
+                
+                except (ValueError, TypeError) as e:
+                    continue
+        
+        return parsed
+    
+    def _save_readings(self, sensor, parsed):
+        """Save one sensor's parsed entries that aren't stored yet."""
+        
+        # Timestamps already stored for this sensor, fetched in one query
+        existing = set(Reading.objects.filter(
+            sensor=sensor,
+            timestamp__in=parsed
+        ).values_list('timestamp', flat=True))
+        
+        readings_to_create = [
+            Reading(
+                sensor=sensor,
+                timestamp=timestamp,
+                no2=self._parse_value(entry.get('no2')),
+                pm25=self._parse_value(entry.get('pm2_5')),
+                pm10=self._parse_value(entry.get('pm10')),
+            )
+            for timestamp, entry in parsed.items()
+            if timestamp not in existing
+        ]
+        
+        # Bulk create
+        if readings_to_create:
+            Reading.objects.bulk_create(
+                readings_to_create,
+                ignore_conflicts=True,
+                batch_size=1000,
+            )
+            Sensor.record_latest_readings(readings_to_create)
+        
+        return len(readings_to_create)
     
     def _parse_value(self, value):
         """Parse and validate pollutant value."""
         if value is None:
             return None
         try:
-            decimal_val = Decimal(str(value))
-            return decimal_val if decimal_val >= 0 else None
+            # Reading stores floats, so there is no need to go through Decimal
+            float_val = float(value)
+            return float_val if float_val >= 0 else None
         except (ValueError, TypeError):
             return None
\ No newline at end of file
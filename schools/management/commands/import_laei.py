@@ -1,8 +1,17 @@
 from django.core.management.base import BaseCommand
+from django.utils import timezone
 from schools.models import School
+from maps.cache import clear_map_cache
 import json
 from decimal import Decimal
 
+
+# School columns written by the import
+LAEI_FIELDS = [
+    'no2_2022', 'nox_2022', 'pm25_2022', 'pm10_mean_2022', 'pm10_days_2022',
+    'laei_data_available', 'updated_at',
+]
+
 class Command(BaseCommand):
     help = 'Import LAEI pollution data from JSON file'
 
@@ -16,6 +25,8 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         file_path = options['file']
+        # Per-school lines are only written at --verbosity 2 or above
+        verbosity = options['verbosity']
         
         self.stdout.write(f'\n📂 Loading pollution data from: {file_path}')
         
@@ -30,13 +41,37 @@ class Command(BaseCommand):
         not_found = 0
         no_data = 0
         
+        # Load the schools at the JSON's postcodes once, keyed the way the
+        # JSON identifies them, instead of querying per entry
+        postcodes = {d['postcode'] for d in schools_data if 'postcode' in d}
+        schools_by_key = {}
+        for school in School.objects.filter(postcode__in=postcodes):
+            schools_by_key.setdefault((school.postcode, school.name), []).append(school)
+        
+        # Matched schools are written in batches after the loop
+        now = timezone.now()
+        to_update = []
+        
         for school_data in schools_data:
             # Try to find school by postcode and name
             try:
-                school = School.objects.get(
-                    postcode=school_data['postcode'],
-                    name=school_data['name']
-                )
+                matches = schools_by_key.get((school_data['postcode'], school_data['name']))
+                
+                if not matches:
+                    not_found += 1
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f'⚠ School not found: {school_data["name"]} ({school_data["postcode"]})'
+                        )
+                    )
+                    continue
+                
+                if len(matches) > 1:
+                    raise School.MultipleObjectsReturned(
+                        f'{len(matches)} schools share this name and postcode'
+                    )
+                
+                school = matches[0]
                 
                 # Check if pollution data is available
                 if not school_data.get('laei_found', False):
@@ -53,24 +88,24 @@ class Command(BaseCommand):
                 school.pm10_mean_2022 = concentrations.get('PM10_mean_2022')
                 school.pm10_days_2022 = concentrations.get('PM10_days_2022')
                 school.laei_data_available = True
+                # bulk_update skips save(), so auto_now has to be set by hand
+                school.updated_at = now
                 
-                school.save()
+                to_update.append(school)
                 updated += 1
                 
-                self.stdout.write(f'✓ Updated: {school.name}')
+                if verbosity >= 2:
+                    self.stdout.write(f'✓ Updated: {school.name}')
                 
-            except School.DoesNotExist:
-                not_found += 1
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'⚠ School not found: {school_data["name"]} ({school_data["postcode"]})'
-                    )
-                )
             except Exception as e:
                 self.stdout.write(
                     self.style.ERROR(f'❌ Error processing {school_data["name"]}: {str(e)}')
                 )
         
+        School.objects.bulk_update(to_update, LAEI_FIELDS, batch_size=500)
+        # No post_save signals were sent, so drop the cached map data here
+        clear_map_cache()
+        
         # Summary
         self.stdout.write('\n' + '='*70)
         self.stdout.write(self.style.SUCCESS(f'\n✅ Import Complete!'))
@@ -7,7 +7,25 @@ Usage:
 
 import requests
 from django.core.management.base import BaseCommand
+from air_quality import jsonutil
 from schools.models import Sensor
+from maps.cache import clear_map_cache
+
+
+# LAQN site types mapped to our choices; anything else is urban background
+SITE_TYPE_MAP = {
+    'roadside': 'roadside',
+    'kerbside': 'kerbside',
+    'urban_background': 'urban_background',
+    'suburban': 'suburban',
+    'industrial': 'industrial',
+}
+
+# Sensor columns overwritten when a site is imported again
+SENSOR_FIELDS = [
+    'name', 'latitude', 'longitude', 'network', 'site_type',
+    'borough', 'is_active', 'metadata', 'updated_at',
+]
 
 
 class Command(BaseCommand):
@@ -18,18 +36,22 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write('Fetching LAQN sensor data...')
         
+        # Per-site lines are only written at --verbosity 2 or above
+        verbosity = options['verbosity']
+        
         try:
             response = requests.get(self.API_URL, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = jsonutil.loads(response.content)
             
             if 'Sites' not in data or 'Site' not in data['Sites']:
                 self.stdout.write(self.style.ERROR('Unexpected API response structure'))
                 return
             
             sites = data['Sites']['Site']
-            created_count = 0
-            updated_count = 0
+            
+            # Sites keyed by code, so a site listed twice is only saved once
+            to_upsert = {}
             
             for site in sites:
                 site_code = site.get('@SiteCode')
@@ -43,39 +65,53 @@ class Command(BaseCommand):
                     continue
                 
                 # Map LAQN site types to our choices
-                site_type_mapping = {
-                    'roadside': 'roadside',
-                    'kerbside': 'kerbside',
-                    'urban_background': 'urban_background',
-                    'suburban': 'suburban',
-                    'industrial': 'industrial',
-                }
-                mapped_type = site_type_mapping.get(site_type, 'urban_background')
+                mapped_type = SITE_TYPE_MAP.get(site_type, 'urban_background')
                 
-                # Create or update sensor
-                sensor, created = Sensor.objects.update_or_create(
+                to_upsert[site_code] = Sensor(
                     site_code=site_code,
-                    defaults={
-                        'name': site_name,
-                        'latitude': latitude,
-                        'longitude': longitude,
-                        'network': 'LAQN',
-                        'site_type': mapped_type,
-                        'borough': borough,
-                        'is_active': True,
-                        'metadata': {
-                            'original_site_type': site.get('@SiteType'),
-                            'site_link': site.get('@SiteLink'),
-                        }
+                    name=site_name,
+                    latitude=latitude,
+                    longitude=longitude,
+                    network='LAQN',
+                    site_type=mapped_type,
+                    borough=borough,
+                    is_active=True,
+                    metadata={
+                        'original_site_type': site.get('@SiteType'),
+                        'site_link': site.get('@SiteLink'),
                     }
                 )
-                
-                if created:
+            
+            # One query to tell new sites from ones already stored
+            existing = set(
+                Sensor.objects.filter(
+                    site_code__in=to_upsert.keys()
+                ).values_list('site_code', flat=True)
+            )
+            created_count = 0
+            updated_count = 0
+            
+            for site_code, sensor in to_upsert.items():
+                if site_code not in existing:
                     created_count += 1
-                    self.stdout.write(f'  ✓ Created: {site_code} - {site_name}')
+                    line = f'  ✓ Created: {site_code} - {sensor.name}'
                 else:
                     updated_count += 1
-                    self.stdout.write(f'  ↻ Updated: {site_code} - {site_name}')
+                    line = f'  ↻ Updated: {site_code} - {sensor.name}'
+                
+                if verbosity >= 2:
+                    self.stdout.write(line)
+            
+            # Create or update - a single INSERT ... ON CONFLICT DO UPDATE
+            if to_upsert:
+                Sensor.objects.bulk_create(
+                    to_upsert.values(),
+                    update_conflicts=True,
+                    unique_fields=['site_code'],
+                    update_fields=SENSOR_FIELDS,
+                    batch_size=500,
+                )
+                clear_map_cache()
             
             self.stdout.write(
                 self.style.SUCCESS(
@@ -83,5 +119,5 @@ class Command(BaseCommand):
                 )
             )
         
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             self.stdout.write(self.style.ERROR(f'API request failed: {e}'))
\ No newline at end of file
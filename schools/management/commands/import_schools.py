@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from schools.models import School
+from maps.cache import clear_map_cache
 import csv
 from decimal import Decimal
 
@@ -25,8 +26,15 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(f'Cleared {count} existing schools'))
 
         file_path = options['file']
-        schools_created = 0
+        # Per-school lines are only written at --verbosity 2 or above
+        verbosity = options['verbosity']
         schools_skipped = 0
+        schools_existing = 0
+        
+        # (name, postcode) of every school already stored, loaded once
+        # instead of a get_or_create query per row
+        existing = set(School.objects.values_list('name', 'postcode'))
+        new_schools = []
         
         with open(file_path, 'r', encoding='utf-8') as file:
             reader = csv.DictReader(file)
@@ -41,27 +49,38 @@ class Command(BaseCommand):
                 phase = row.get('phase', 'primary').lower()
                 school_type = 'nursery' if 'nursery' in phase.lower() else 'primary'
                 
-                # Get or create school
-                school, created = School.objects.get_or_create(
+                key = (row['name'], row.get('postcode', ''))
+                if key in existing:
+                    schools_existing += 1
+                    continue
+                existing.add(key)
+                
+                school = School(
                     name=row['name'],
                     postcode=row.get('postcode', ''),
-                    defaults={
-                        'address': row.get('street', ''),
-                        'city': row.get('town', row.get('local_authority', '')),
-                        'borough': row.get('local_authority', ''),
-                        'latitude': Decimal(row['latitude']),
-                        'longitude': Decimal(row['longitude']),
-                        'school_type': school_type,
-                    }
+                    address=row.get('street', ''),
+                    city=row.get('town', row.get('local_authority', '')),
+                    borough=row.get('local_authority', ''),
+                    latitude=Decimal(row['latitude']),
+                    longitude=Decimal(row['longitude']),
+                    school_type=school_type,
                 )
-                
-                if created:
-                    schools_created += 1
+                new_schools.append(school)
+                if verbosity >= 2:
                     self.stdout.write(f'Created: {school.name}')
         
+        # ignore_conflicts covers a school added by another run meanwhile;
+        # it doesn't say which rows it dropped, so count the table instead
+        count_before = School.objects.count()
+        School.objects.bulk_create(new_schools, batch_size=500, ignore_conflicts=True)
+        schools_created = School.objects.count() - count_before
+        schools_existing += len(new_schools) - schools_created
+        clear_map_cache()
+        
         self.stdout.write(
             self.style.SUCCESS(
                 f'\nSuccessfully loaded {schools_created} schools '
-                f'({schools_skipped} skipped due to missing coordinates)'
+                f'({schools_skipped} skipped due to missing coordinates, '
+                f'{schools_existing} already stored)'
             )
         )
\ No newline at end of file
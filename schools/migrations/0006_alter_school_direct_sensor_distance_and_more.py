@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schools', '0005_alter_school_direct_sensor_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='school',
+            name='direct_sensor_distance',
+            field=models.FloatField(blank=True, help_text='Distance to direct sensor in meters', null=True),
+        ),
+        migrations.AlterField(
+            model_name='school',
+            name='no2_2022',
+            field=models.FloatField(blank=True, help_text='NO₂ concentration µg/m³', null=True),
+        ),
+        migrations.AlterField(
+            model_name='school',
+            name='nox_2022',
+            field=models.FloatField(blank=True, help_text='NOₓ concentration µg/m³', null=True),
+        ),
+        migrations.AlterField(
+            model_name='school',
+            name='pm10_days_2022',
+            field=models.FloatField(blank=True, help_text='PM10 days exceeding limit', null=True),
+        ),
+        migrations.AlterField(
+            model_name='school',
+            name='pm10_mean_2022',
+            field=models.FloatField(blank=True, help_text='PM10 annual mean µg/m³', null=True),
+        ),
+        migrations.AlterField(
+            model_name='school',
+            name='pm25_2022',
+            field=models.FloatField(blank=True, help_text='PM2.5 concentration µg/m³', null=True),
+        ),
+        migrations.AlterField(
+            model_name='school',
+            name='reference_sensor_distance',
+            field=models.FloatField(blank=True, help_text='Distance to reference sensor in meters', null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:49
+
+from django.db import migrations, models
+
+
+def remove_duplicate_schools(apps, schema_editor):
+    """
+    Keep one school per (postcode, name) so the constraint can be added.
+    
+    Earlier imports could store the same school twice; the most recently
+    updated row is kept. Nothing references School, so the others can go.
+    """
+    School = apps.get_model('schools', 'School')
+    
+    seen = set()
+    duplicate_ids = []
+    rows = School.objects.order_by('postcode', 'name', '-updated_at', 'id').values_list(
+        'id', 'postcode', 'name'
+    )
+    for school_id, postcode, name in rows.iterator():
+        if (postcode, name) in seen:
+            duplicate_ids.append(school_id)
+        else:
+            seen.add((postcode, name))
+    
+    if duplicate_ids:
+        School.objects.filter(pk__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('air_quality', '0005_reading_created_at_db_default'),
+        ('schools', '0006_alter_school_direct_sensor_distance_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_schools, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='school',
+            constraint=models.UniqueConstraint(fields=('postcode', 'name'), name='uniq_school_postcode_name'),
+        ),
+    ]
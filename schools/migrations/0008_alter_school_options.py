@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:49
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schools', '0007_school_uniq_school_postcode_name'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='school',
+            options={'verbose_name': 'School', 'verbose_name_plural': 'Schools'},
+        ),
+    ]
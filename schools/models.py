@@ -1,6 +1,16 @@
+from datetime import timedelta
 from django.db import models
+from django.db.models import Prefetch
 from django.utils import timezone
-from air_quality.models import Sensor
+from air_quality.models import Sensor, SensorAnnualStats
+
+
+# (UK, EU 2024, WHO) limits in µg/m³ checked by get_threshold_status
+THRESHOLDS = {
+    'no2': (40, 20, 10),
+    'pm25': (25, 10, 5),
+    'pm10': (40, 20, 15),
+}
 
 
 class School(models.Model):
@@ -40,16 +50,13 @@ class School(models.Model):
     # =========================================================================
     # LAEI 2022 Baseline Data (your existing fields)
     # =========================================================================
-    no2_2022 = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, 
-                                    help_text="NO₂ concentration µg/m³")
-    nox_2022 = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, 
-                                    help_text="NOₓ concentration µg/m³")
-    pm25_2022 = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, 
-                                     help_text="PM2.5 concentration µg/m³")
-    pm10_mean_2022 = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, 
-                                          help_text="PM10 annual mean µg/m³")
-    pm10_days_2022 = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, 
-                                          help_text="PM10 days exceeding limit")
+    # Floats, like the sensor readings they are scaled by, so no Decimal
+    # conversion is needed when computing current readings
+    no2_2022 = models.FloatField(null=True, blank=True, help_text="NO₂ concentration µg/m³")
+    nox_2022 = models.FloatField(null=True, blank=True, help_text="NOₓ concentration µg/m³")
+    pm25_2022 = models.FloatField(null=True, blank=True, help_text="PM2.5 concentration µg/m³")
+    pm10_mean_2022 = models.FloatField(null=True, blank=True, help_text="PM10 annual mean µg/m³")
+    pm10_days_2022 = models.FloatField(null=True, blank=True, help_text="PM10 days exceeding limit")
     laei_data_available = models.BooleanField(default=False, help_text="LAEI pollution data available")
     
     # =========================================================================
@@ -71,8 +78,7 @@ class School(models.Model):
         related_name='direct_schools',
         help_text='Urban background sensor within 150m'
     )
-    direct_sensor_distance = models.DecimalField(
-        max_digits=7, decimal_places=1,
+    direct_sensor_distance = models.FloatField(
         null=True, blank=True,
         help_text='Distance to direct sensor in meters'
     )
@@ -86,8 +92,7 @@ class School(models.Model):
         related_name='reference_schools',
         help_text='Nearest LAQN sensor for adjustment factors'
     )
-    reference_sensor_distance = models.DecimalField(
-        max_digits=8, decimal_places=1,
+    reference_sensor_distance = models.FloatField(
         null=True, blank=True,
         help_text='Distance to reference sensor in meters'
     )
@@ -97,13 +102,44 @@ class School(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['name']
+        # No default ordering - lists that are shown sort by name themselves,
+        # so lookups and bulk updates don't pay for an ORDER BY
         verbose_name = 'School'
         verbose_name_plural = 'Schools'
+        constraints = [
+            # The key the import commands identify schools by; postcode
+            # first so its index also serves postcode lookups
+            models.UniqueConstraint(
+                fields=['postcode', 'name'],
+                name='uniq_school_postcode_name'
+            ),
+        ]
     
     def __str__(self):
         return self.name
     
+    @classmethod
+    def with_air_quality(cls):
+        """
+        Schools with everything get_current_reading() needs loaded up front.
+        
+        Both sensors are joined in and the reference sensor's annual stats
+        prefetched, so iterating the result takes a fixed number of queries
+        rather than several per school.
+        """
+        return cls.objects.select_related(
+            'direct_sensor', 'reference_sensor'
+        ).defer(
+            # Sensor metadata JSON is never read here
+            'direct_sensor__metadata', 'reference_sensor__metadata'
+        ).prefetch_related(
+            Prefetch(
+                'reference_sensor__annual_stats',
+                queryset=SensorAnnualStats.objects.order_by('-year'),
+                to_attr='annual_stats_by_year'
+            )
+        )
+    
     # =========================================================================
     # NEW: Methods for Real-Time Data
     # =========================================================================
@@ -116,8 +152,11 @@ class School(models.Model):
         2. LAEI × adjustment: Scale baseline by sensor temporal factor
         3. LAEI only: Fall back to modelled baseline
         """
+        # One clock reading for the result and every freshness check
+        now = timezone.now()
+        
         result = {
-            'timestamp': timezone.now(),
+            'timestamp': now,
             'source': self.data_source,
             'method': None,
             'confidence': 'low',
@@ -129,21 +168,21 @@ class School(models.Model):
         # Method 1: Direct sensor reading
         if self.direct_sensor:
             reading = self.direct_sensor.get_latest_reading()
-            if reading and self._is_reading_fresh(reading):
+            if reading and self._is_reading_fresh(reading, now=now):
                 result.update({
-                    'no2': float(reading.no2) if reading.no2 else None,
-                    'pm25': float(reading.pm25) if reading.pm25 else None,
-                    'pm10': float(reading.pm10) if reading.pm10 else None,
+                    'no2': reading.no2 or None,
+                    'pm25': reading.pm25 or None,
+                    'pm10': reading.pm10 or None,
                     'method': 'direct',
                     'confidence': 'high' if self.direct_sensor.is_reference_grade else 'medium-high',
                     'sensor_code': self.direct_sensor.site_code,
-                    'sensor_distance': float(self.direct_sensor_distance) if self.direct_sensor_distance else None,
+                    'sensor_distance': self.direct_sensor_distance or None,
                 })
                 return result
         
         # Method 2: LAEI baseline × adjustment factor
         if self.reference_sensor and self._has_laei_data():
-            adjustment = self._calculate_adjustment_factor()
+            adjustment = self._calculate_adjustment_factor(now=now)
             if adjustment:
                 result.update({
                     'no2': self._apply_adjustment(self.no2_2022, adjustment.get('no2')),
@@ -153,11 +192,11 @@ class School(models.Model):
                     'confidence': 'medium',
                     'adjustment_factors': adjustment,
                     'reference_sensor': self.reference_sensor.site_code,
-                    'reference_distance': float(self.reference_sensor_distance) if self.reference_sensor_distance else None,
+                    'reference_distance': self.reference_sensor_distance or None,
                     'laei_baseline': {
-                        'no2': float(self.no2_2022) if self.no2_2022 else None,
-                        'pm25': float(self.pm25_2022) if self.pm25_2022 else None,
-                        'pm10': float(self.pm10_mean_2022) if self.pm10_mean_2022 else None,
+                        'no2': self.no2_2022 or None,
+                        'pm25': self.pm25_2022 or None,
+                        'pm10': self.pm10_mean_2022 or None,
                     }
                 })
                 return result
@@ -165,9 +204,9 @@ class School(models.Model):
         # Method 3: LAEI baseline only
         if self._has_laei_data():
             result.update({
-                'no2': float(self.no2_2022) if self.no2_2022 else None,
-                'pm25': float(self.pm25_2022) if self.pm25_2022 else None,
-                'pm10': float(self.pm10_mean_2022) if self.pm10_mean_2022 else None,
+                'no2': self.no2_2022 or None,
+                'pm25': self.pm25_2022 or None,
+                'pm10': self.pm10_mean_2022 or None,
                 'method': 'laei_only',
                 'confidence': 'low',
                 'note': 'Modelled annual average — current conditions may vary',
@@ -175,28 +214,27 @@ class School(models.Model):
         
         return result
     
-    def _is_reading_fresh(self, reading, max_age_seconds: int = 86400) -> bool:
-        """Check if reading is recent enough (default: 2 hours)."""
+    def _is_reading_fresh(self, reading, max_age_seconds: int = 86400, now=None) -> bool:
+        """Check if reading is recent enough (default: 24 hours)."""
         if not reading or not reading.timestamp:
             return False
-        age = (timezone.now() - reading.timestamp).total_seconds()
-        return age <= max_age_seconds
+        cutoff = (now or timezone.now()) - timedelta(seconds=max_age_seconds)
+        return reading.timestamp >= cutoff
     
     def _has_laei_data(self) -> bool:
         """Check if school has LAEI baseline data."""
-        return any([self.no2_2022, self.pm25_2022, self.pm10_mean_2022])
+        return bool(self.no2_2022 or self.pm25_2022 or self.pm10_mean_2022)
     
     def _apply_adjustment(self, baseline, factor) -> float:
         """Apply adjustment factor to baseline with safety checks."""
         if baseline is None or factor is None:
-            return float(baseline) if baseline else None
+            return baseline or None
         
-        baseline_float = float(baseline)
         # Cap extreme adjustments (sensor malfunction protection)
         capped_factor = max(0.2, min(factor, 5.0))
-        return round(baseline_float * capped_factor, 1)
+        return round(baseline * capped_factor, 1)
     
-    def _calculate_adjustment_factor(self) -> dict:
+    def _calculate_adjustment_factor(self, now=None) -> dict:
         """
         Calculate adjustment factor from reference sensor readings.
         """
@@ -204,14 +242,14 @@ class School(models.Model):
             return {}
     
         reading = self.reference_sensor.get_latest_reading()
-        if not reading or not self._is_reading_fresh(reading):
+        if not reading or not self._is_reading_fresh(reading, now=now):
             return {}
     
         # Check if reading is from outside school hours (7:00-18:30)
         reading_hour = reading.timestamp.hour
         is_school_hours = 7 <= reading_hour < 19
     
-        stats = self.reference_sensor.annual_stats.order_by('-year').first()
+        stats = self.reference_sensor.get_latest_annual_stats()
         if not stats:
             return {}
         
@@ -220,14 +258,14 @@ class School(models.Model):
             'is_school_hours': is_school_hours,
         }
         
-        if reading.no2 and stats.no2_mean and float(stats.no2_mean) > 0:
-            factors['no2'] = round(float(reading.no2) / float(stats.no2_mean), 3)
+        if reading.no2 and stats.no2_mean and stats.no2_mean > 0:
+            factors['no2'] = round(reading.no2 / stats.no2_mean, 3)
         
-        if reading.pm25 and stats.pm25_mean and float(stats.pm25_mean) > 0:
-            factors['pm25'] = round(float(reading.pm25) / float(stats.pm25_mean), 3)
+        if reading.pm25 and stats.pm25_mean and stats.pm25_mean > 0:
+            factors['pm25'] = round(reading.pm25 / stats.pm25_mean, 3)
         
-        if reading.pm10 and stats.pm10_mean and float(stats.pm10_mean) > 0:
-            factors['pm10'] = round(float(reading.pm10) / float(stats.pm10_mean), 3)
+        if reading.pm10 and stats.pm10_mean and stats.pm10_mean > 0:
+            factors['pm10'] = round(reading.pm10 / stats.pm10_mean, 3)
         
         return factors
     
@@ -235,24 +273,17 @@ class School(models.Model):
         """Compare current reading against UK, EU 2024, and WHO thresholds."""
         reading = self.get_current_reading()
         
-        thresholds = {
-            'no2': {'uk': 40, 'eu_2024': 20, 'who': 10},
-            'pm25': {'uk': 25, 'eu_2024': 10, 'who': 5},
-            'pm10': {'uk': 40, 'eu_2024': 20, 'who': 15},
-        }
-        
         status = {}
-        for pollutant in ['no2', 'pm25', 'pm10']:
+        for pollutant, (uk, eu_2024, who) in THRESHOLDS.items():
             value = reading.get(pollutant)
             if value is None:
                 continue
             
-            t = thresholds[pollutant]
             status[pollutant] = {
                 'value': round(value, 1),
-                'meets_uk': value <= t['uk'],
-                'meets_eu_2024': value <= t['eu_2024'],
-                'meets_who': value <= t['who'],
+                'meets_uk': value <= uk,
+                'meets_eu_2024': value <= eu_2024,
+                'meets_who': value <= who,
             }
         
         return status
\ No newline at end of file
@@ -1,6 +1,15 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.core.management import call_command
 from django.urls import reverse
+from datetime import datetime, timedelta, timezone as dt_timezone
 from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+import json
+import os
+import tempfile
+from air_quality.models import Sensor, Reading, SensorAnnualStats
 from .models import School
 
 # Create your tests here.
@@ -52,4 +61,305 @@ class SchoolModelTest(TestCase):
         )
         self.assertIsNone(school.phone)
         self.assertIsNone(school.email)
-        self.assertIsNone(school.student_count)
\ No newline at end of file
+        self.assertIsNone(school.student_count)
+    
+    def test_threshold_status_from_laei_baseline(self):
+        """Test LAEI-only schools are checked against each guideline"""
+        self.school.no2_2022 = 23.55
+        self.school.pm25_2022 = 9.75
+        status = self.school.get_threshold_status()
+        self.assertEqual(status['no2'], {
+            'value': 23.6, 'meets_uk': True, 'meets_eu_2024': False, 'meets_who': False,
+        })
+        self.assertTrue(status['pm25']['meets_eu_2024'])
+        self.assertNotIn('pm10', status)
+    
+    def test_zero_laei_values_not_treated_as_data(self):
+        """Test a school whose LAEI columns are all 0.0 gets no laei_only reading"""
+        self.school.no2_2022 = 0.0
+        self.school.pm25_2022 = 0.0
+        self.school.pm10_mean_2022 = 0.0
+        self.assertIsNone(self.school.get_current_reading()['method'])
+
+
+class SchoolsListViewTest(TestCase):
+    """Test cases for the schools_list view"""
+    
+    def setUp(self):
+        """Create two schools"""
+        for name in ("Beta Primary School", "Alpha Nursery School"):
+            School.objects.create(
+                name=name, address="1 Test St", city="London", postcode="SE1 1AA",
+                latitude=Decimal("51.5"), longitude=Decimal("-0.1"), student_count=100
+            )
+    
+    def test_list_rendered_in_one_query(self):
+        """Test every school is listed, by name, from a single query"""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('schools:schools_list'))
+        self.assertEqual(response.status_code, 200)
+        names = [school.name for school in response.context['schools']]
+        self.assertEqual(names, ["Alpha Nursery School", "Beta Primary School"])
+
+
+class ImportLaeiCommandTest(TestCase):
+    """Test cases for the import_laei management command"""
+    
+    def setUp(self):
+        """Create a school and an LAEI JSON file covering it"""
+        self.school = School.objects.create(
+            name="Triangle Nursery School",
+            address="1 Test St",
+            city="London",
+            postcode="SW2 1PL",
+            latitude=Decimal("51.4567"),
+            longitude=Decimal("-0.1099"),
+            school_type="nursery"
+        )
+        data = [
+            {'name': 'Triangle Nursery School', 'postcode': 'SW2 1PL', 'laei_found': True,
+             'concentrations': {'NO2_2022': 23.55, 'NOx_2022': 34.48, 'PM25_2022': 9.75,
+                                'PM10_mean_2022': 16.84, 'PM10_days_2022': 4.83}},
+            {'name': 'Missing School', 'postcode': 'SE1 1AA', 'laei_found': True},
+        ]
+        tmp = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        with tmp:
+            json.dump(data, tmp)
+        self.addCleanup(os.remove, tmp.name)
+        self.file_path = tmp.name
+    
+    def test_import_updates_matching_schools(self):
+        """Test LAEI values are saved and unmatched entries reported"""
+        out = StringIO()
+        call_command('import_laei', file=self.file_path, stdout=out)
+        self.school.refresh_from_db()
+        self.assertEqual(self.school.no2_2022, 23.55)
+        self.assertEqual(self.school.pm10_days_2022, 4.83)
+        self.assertTrue(self.school.laei_data_available)
+        self.assertIn('Schools updated:       1', out.getvalue())
+        self.assertIn('Schools not found:     1', out.getvalue())
+
+
+class ImportSchoolsCommandTest(TestCase):
+    """Test cases for the import_schools management command"""
+    
+    def setUp(self):
+        """Create a school and a CSV holding it, a new school and bad rows"""
+        School.objects.create(
+            name="Existing School", address="1 Test St", city="London",
+            postcode="SE1 1AA", latitude=Decimal("51.5"), longitude=Decimal("-0.1")
+        )
+        rows = [
+            'name,postcode,street,town,local_authority,latitude,longitude,phase',
+            'Existing School,SE1 1AA,1 Test St,London,Southwark,51.5,-0.1,Primary',
+            'New Nursery,SW2 1PL,2 Test St,London,Lambeth,51.4567,-0.1099,Nursery',
+            'New Nursery,SW2 1PL,2 Test St,London,Lambeth,51.4567,-0.1099,Nursery',
+            'No Location,SE5 5EE,3 Test St,London,Southwark,,,Primary',
+        ]
+        tmp = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        with tmp:
+            tmp.write('\n'.join(rows) + '\n')
+        self.addCleanup(os.remove, tmp.name)
+        self.file_path = tmp.name
+    
+    def test_only_new_schools_created(self):
+        """Test existing and repeated schools are not created twice"""
+        out = StringIO()
+        call_command('import_schools', file=self.file_path, stdout=out)
+        self.assertEqual(School.objects.count(), 2)
+        school = School.objects.get(name="New Nursery")
+        self.assertEqual(school.school_type, 'nursery')
+        self.assertEqual(school.borough, 'Lambeth')
+        self.assertIn(
+            'Successfully loaded 1 schools (1 skipped due to missing coordinates, '
+            '2 already stored)', out.getvalue()
+        )
+        self.assertNotIn('Created: New Nursery', out.getvalue())
+    
+    def test_verbose_lists_created_schools(self):
+        """Test per-school lines are written at verbosity 2"""
+        out = StringIO()
+        call_command('import_schools', file=self.file_path, verbosity=2, stdout=out)
+        self.assertIn('Created: New Nursery', out.getvalue())
+
+
+class CalculateSensorStatsCommandTest(TestCase):
+    """Test cases for the calculate_sensor_stats management command"""
+    
+    def setUp(self):
+        """Create a sensor with a well-covered 2023 and a sparse 2024"""
+        self.sensor = Sensor.objects.create(
+            site_code="LB4", name="Lambeth - Brixton Road",
+            latitude=51.46, longitude=-0.11,
+            network='LAQN', site_type='urban_background'
+        )
+        start = datetime(2023, 1, 2, tzinfo=dt_timezone.utc)
+        hours = [start + timedelta(hours=h) for h in range(7000)]
+        hours += [datetime(2024, 6, 1, h, tzinfo=dt_timezone.utc) for h in range(10)]
+        Reading.objects.bulk_create([
+            Reading(sensor=self.sensor, timestamp=ts, no2=20.0, pm25=8.0)
+            for ts in hours
+        ])
+        SensorAnnualStats.objects.create(sensor=self.sensor, year=2023, no2_mean=1.0)
+    
+    def test_stats_saved_for_covered_years(self):
+        """Test well-covered years are upserted and sparse years skipped"""
+        out = StringIO()
+        call_command('calculate_sensor_stats', stdout=out)
+        stats = SensorAnnualStats.objects.get(sensor=self.sensor, year=2023)
+        self.assertEqual(stats.no2_mean, 20.0)
+        self.assertEqual(stats.capture_rate, 79.91)
+        self.assertFalse(SensorAnnualStats.objects.filter(year=2024).exists())
+        self.assertIn('Updated: 7000 readings', out.getvalue())
+        self.assertIn('Insufficient data', out.getvalue())
+
+
+class FetchLaqnDataCommandTest(TestCase):
+    """Test cases for the fetch_laqn_data management command"""
+    
+    def setUp(self):
+        """Create an LAQN sensor and a sample API response"""
+        self.sensor = Sensor.objects.create(
+            site_code="LB4", name="Lambeth - Brixton Road",
+            latitude=51.46, longitude=-0.11,
+            network='LAQN', site_type='urban_background'
+        )
+        self.response = {'RawAQData': {'Data': [
+            {'@MeasurementDateGMT': '2026-01-25 10:00:00', '@Value': '21.5'},
+            {'@MeasurementDateGMT': '2026-01-25 11:00:00', '@Value': '-1'},
+            {'@MeasurementDateGMT': '2026-01-25 12:00:00', '@Value': ''},
+        ]}}
+    
+    @patch('schools.management.commands.fetch_laqn_data.requests.Session.get')
+    def test_readings_combined_per_timestamp(self, mock_get):
+        """Test each species' values are saved on one UTC reading per hour"""
+        mock_get.return_value.json.return_value = self.response
+        mock_get.return_value.content = json.dumps(self.response).encode()
+        out = StringIO()
+        call_command('fetch_laqn_data', stdout=out)
+        self.assertIn('Total: 1 readings imported', out.getvalue())
+        reading = Reading.objects.get(sensor=self.sensor)
+        self.assertEqual(reading.timestamp, datetime(2026, 1, 25, 10, tzinfo=dt_timezone.utc))
+        self.assertEqual(reading.no2, 21.5)
+        self.assertEqual(reading.o3, 21.5)
+        self.sensor.refresh_from_db()
+        self.assertEqual(self.sensor.last_reading_at, reading.timestamp)
+    
+    @patch('schools.management.commands.fetch_laqn_data.requests.Session.get')
+    def test_non_json_response_skipped(self, mock_get):
+        """Test an HTML error page is reported rather than aborting the run"""
+        mock_get.return_value.json.side_effect = ValueError('Expecting value')
+        mock_get.return_value.content = b'<html>Service Unavailable</html>'
+        out = StringIO()
+        call_command('fetch_laqn_data', stdout=out)
+        self.assertIn('Error fetching LB4', out.getvalue())
+        self.assertIn('Total: 0 readings imported', out.getvalue())
+
+
+@override_settings(BREATHE_LONDON_API_KEY='test-key')
+class FetchBreatheLondonDataCommandTest(TestCase):
+    """Test cases for the fetch_breathe_london_data management command"""
+    
+    def setUp(self):
+        """Create a Breathe London sensor with one stored reading"""
+        self.sensor = Sensor.objects.create(
+            site_code="BL0001", name="Breathe Park",
+            latitude=51.5, longitude=-0.1,
+            network='BREATHE', site_type='urban_background'
+        )
+        Reading.objects.create(
+            sensor=self.sensor,
+            timestamp=datetime(2026, 1, 25, 10, tzinfo=dt_timezone.utc),
+            no2=20.0
+        )
+        self.response = {'readings': [
+            {'timestamp': '2026-01-25T10:00:00+00:00', 'no2': 21.5},
+            {'timestamp': '2026-01-25T11:00:00+00:00', 'no2': 25.0, 'pm2_5': 8.2},
+        ]}
+    
+    @patch('schools.management.commands.fetch_breathe_london_data.requests.Session.get')
+    def test_existing_readings_skipped(self, mock_get):
+        """Test only timestamps not already stored are imported"""
+        mock_get.return_value.json.return_value = self.response
+        mock_get.return_value.content = json.dumps(self.response).encode()
+        out = StringIO()
+        call_command('fetch_breathe_london_data', stdout=out)
+        self.assertIn('Total: 1 readings imported', out.getvalue())
+        self.assertEqual(Reading.objects.filter(sensor=self.sensor).count(), 2)
+        stored = Reading.objects.get(sensor=self.sensor, timestamp__hour=10)
+        self.assertEqual(stored.no2, 20.0)
+    
+    @patch('schools.management.commands.fetch_breathe_london_data.requests.Session.get')
+    def test_latest_reading_recorded_on_sensor(self, mock_get):
+        """Test the newest imported reading is copied onto the sensor"""
+        mock_get.return_value.json.return_value = self.response
+        mock_get.return_value.content = json.dumps(self.response).encode()
+        call_command('fetch_breathe_london_data', stdout=StringIO())
+        self.sensor.refresh_from_db()
+        self.assertEqual(self.sensor.last_reading_at, datetime(2026, 1, 25, 11, tzinfo=dt_timezone.utc))
+        latest = self.sensor.get_latest_reading()
+        self.assertEqual(latest.no2, 25.0)
+        self.assertEqual(latest.pm25, 8.2)
+
+
+class ImportLaqnSensorsCommandTest(TestCase):
+    """Test cases for the import_laqn_sensors management command"""
+    
+    def setUp(self):
+        """Create one stored sensor and a sample API response"""
+        Sensor.objects.create(
+            site_code="LB4", name="Old Name",
+            latitude=51.46, longitude=-0.11,
+            network='LAQN', site_type='urban_background'
+        )
+        self.response = {'Sites': {'Site': [
+            {'@SiteCode': 'LB4', '@SiteName': 'Lambeth - Brixton Road',
+             '@Latitude': '51.4645', '@Longitude': '-0.1149',
+             '@SiteType': 'Kerbside', '@LocalAuthorityName': 'Lambeth'},
+            {'@SiteCode': 'SK5', '@SiteName': 'Southwark - A2 Old Kent Road',
+             '@Latitude': '51.4805', '@Longitude': '-0.0595',
+             '@SiteType': 'Roadside', '@LocalAuthorityName': 'Southwark'},
+            {'@SiteCode': 'XX1', '@SiteName': 'No Location'},
+        ]}}
+    
+    @patch('schools.management.commands.import_laqn_sensors.requests.get')
+    def test_sites_created_and_updated(self, mock_get):
+        """Test new sites are created and stored sites updated"""
+        mock_get.return_value.json.return_value = self.response
+        mock_get.return_value.content = json.dumps(self.response).encode()
+        out = StringIO()
+        call_command('import_laqn_sensors', stdout=out)
+        self.assertIn('Created: 1, Updated: 1', out.getvalue())
+        sensor = Sensor.objects.get(site_code='LB4')
+        self.assertEqual(sensor.name, 'Lambeth - Brixton Road')
+        self.assertEqual(sensor.site_type, 'kerbside')
+        self.assertEqual(Sensor.objects.get(site_code='SK5').borough, 'Southwark')
+        self.assertFalse(Sensor.objects.filter(site_code='XX1').exists())
+
+
+class SchoolAdminTest(TestCase):
+    """Test cases for the School admin pages"""
+    
+    def setUp(self):
+        """Create a school and log in as a superuser"""
+        self.school = School.objects.create(
+            name="Test Primary School", address="123 Test Street", city="London",
+            postcode="SE1 1AA", latitude=Decimal("51.5074"), longitude=Decimal("-0.1278")
+        )
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+    
+    def test_changelist_loads_displayed_columns_only(self):
+        """Test the change list defers columns it doesn't display"""
+        response = self.client.get(reverse('admin:schools_school_changelist'))
+        self.assertEqual(response.status_code, 200)
+        school = response.context['cl'].result_list[0]
+        self.assertIn('address', school.get_deferred_fields())
+        self.assertNotIn('no2_2022', school.get_deferred_fields())
+    
+    def test_change_form_loads_full_school(self):
+        """Test the change form still shows deferred columns"""
+        response = self.client.get(
+            reverse('admin:schools_school_change', args=[self.school.pk])
+        )
+        self.assertContains(response, '123 Test Street')
@@ -4,7 +4,11 @@ import json
 
 def schools_list(request):
     """List all schools"""
-    schools = School.objects.all().order_by('name')
+    # Only the fields the template shows; it never touches the sensors,
+    # so nothing needs joining in
+    schools = School.objects.only(
+        'name', 'school_type', 'address', 'city', 'postcode', 'student_count'
+    ).order_by('name')
     return render(request, 'schools/schools_list.html', {'schools': schools})
 
 def login_view(request):
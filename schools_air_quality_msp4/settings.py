@@ -31,6 +31,9 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=Csv())
 # Air Quality API Keys
 BREATHE_LONDON_API_KEY = config('BREATHE_LONDON_API_KEY', default='')
 
+# Seconds the map's school and sensor JSON is cached before being rebuilt
+MAP_CACHE_TIMEOUT = config('MAP_CACHE_TIMEOUT', default=300, cast=int)
+
 
 # Application definition
 
@@ -87,6 +90,20 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Reuse connections across requests instead of reconnecting each time
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# A file cache, so the management commands run from cron and every web worker
+# on the host see (and clear) the same cached map data
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / '.django_cache')),
     }
 }
 